@@ -63,7 +63,7 @@ const Articles = () => {
             result = result.filter(article =>
                 article.title?.toLowerCase().includes(term) ||
                 article.summary?.toLowerCase().includes(term) ||
-                article.content?.toLowerCase().includes(term) ||
+                article.excerpt?.toLowerCase().includes(term) ||
                 article.tags?.some(t => t.name?.toLowerCase().includes(term))
             );
         }
@@ -221,11 +221,14 @@ const Articles = () => {
                                     {article.attachments?.length > 0 && (
                                         <span><i className="fa-solid fa-paperclip"></i> {article.attachments.length} קבצים</span>
                                     )}
+                                    {article.reading_minutes > 0 && (
+                                        <span><i className="fa-solid fa-clock"></i> {article.reading_minutes} דק' קריאה</span>
+                                    )}
                                 </div>
                             </div>
 
                             <div className="article-card-body">
-                                <p className="article-summary">{article.summary || 'אין תקציר'}</p>
+                                <p className="article-summary">{article.summary || article.excerpt || 'אין תקציר'}</p>
                                 <div className="article-tags">
                                     <span className="tag category">{article.category_name}</span>
                                     <span className="tag department">{article.department_name}</span>
@@ -171,6 +171,23 @@ export const uploadAPI = {
         });
         return response.data;
     },
+
+    // Convert DOCX/HTML/Markdown files on the server; returns { documents: [{ title, summary, html, attachments } | { error }] }
+    importDocuments: async (files) => {
+        const formData = new FormData();
+        for (const file of files) {
+            formData.append('file', file);
+        }
+
+        const session = getSession();
+        const response = await axios.post(`${API_BASE}/import`, formData, {
+            headers: {
+                'Content-Type': 'multipart/form-data',
+                Authorization: session?.access_token ? `Bearer ${session.access_token}` : '',
+            },
+        });
+        return response.data;
+    },
 };
 
 // ==========================================
@@ -115,6 +115,7 @@ describe('API Modules Structure', () => {
         expect(api.uploadAPI).toBeDefined();
         expect(typeof api.uploadAPI.uploadAttachment).toBe('function');
         expect(typeof api.uploadAPI.uploadImage).toBe('function');
+        expect(typeof api.uploadAPI.importDocuments).toBe('function');
 
         // Check users API
         expect(api.usersAPI).toBeDefined();
@@ -0,0 +1,158 @@
+"""
+Hebrew-aware text analyzer for Knowledge Repository search
+Normalizes niqqud and final letters and expands prefixed words, so the same
+terms are produced when building the search index and when parsing queries
+"""
+
+import itertools
+import re
+import unicodedata
+
+# Niqqud and cantillation marks (U+0591-U+05C7), excluding the punctuation
+# characters in that block: maqaf, paseq, sof pasuq and nun hafukha
+NIQQUD_RE = re.compile('[\u0591-\u05bd\u05bf\u05c1\u05c2\u05c4\u05c5\u05c7]')
+
+# Geresh / gershayim (and their ASCII stand-ins) inside words, e.g. צה"ל, ג'ירפה
+ABBREVIATION_MARKS_RE = re.compile('(?<=\\w)[\u05f3\u05f4\'"](?=\\w)')
+
+FINAL_LETTERS = str.maketrans({
+    'ך': 'כ',
+    'ם': 'מ',
+    'ן': 'נ',
+    'ף': 'פ',
+    'ץ': 'צ'
+})
+
+# Letter -> its final form, for words typed without one
+FINAL_FORMS = {'כ': 'ך', 'מ': 'ם', 'נ': 'ן', 'פ': 'ף', 'צ': 'ץ'}
+
+# Single-letter prefixes: ו ה ב ל מ ש כ (and combinations such as וכש, שב, ומה)
+PREFIX_LETTERS = frozenset('והבלמשכ')
+MAX_PREFIX_LENGTH = 3
+
+# Shortest stem kept when stripping prefixes while indexing / querying.
+# Queries never look up shorter stems, so indexing them would only grow the
+# GIN index; a stem can still be a real word that merely starts with a prefix
+# letter ('מחשב' -> 'חשב'), so matches of the words as typed rank first
+MIN_INDEX_STEM = 3
+MIN_QUERY_STEM = 3
+
+# Highlighting runs over the original text, so prefixed forms of the query
+# words are spelled out: every combination of up to this many prefix letters
+# (7 + 49 per form). Three-letter ones would make ts_headline several times slower
+# for the few words they add; such words still match, but are not marked.
+MAX_HIGHLIGHT_PREFIX_LENGTH = 2
+
+HEBREW_RE = re.compile('[\u05d0-\u05ea]')
+TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize(text: str) -> str:
+    """Strip niqqud and abbreviation marks, fold final letters and case."""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFC', text)
+    text = NIQQUD_RE.sub('', text)
+    text = ABBREVIATION_MARKS_RE.sub('', text)
+    return text.translate(FINAL_LETTERS).lower()
+
+
+def tokenize(text: str) -> list:
+    """Split text into normalized tokens."""
+    return TOKEN_RE.findall(normalize(text))
+
+
+def prefix_variants(token: str, min_stem: int = MIN_INDEX_STEM) -> list:
+    """
+    Return the token with up to MAX_PREFIX_LENGTH Hebrew prefix letters
+    stripped, shortest prefix first (e.g. 'והמחשב' -> ['המחשב', 'מחשב']).
+    """
+    variants = []
+    if not HEBREW_RE.match(token):
+        return variants
+
+    for i in range(1, MAX_PREFIX_LENGTH + 1):
+        if token[i - 1] not in PREFIX_LETTERS or len(token) - i < min_stem:
+            break
+        variants.append(token[i:])
+    return variants
+
+
+def index_terms(text: str) -> list:
+    """Tokens plus their prefix-stripped variants, for building the index."""
+    terms = []
+    for token in tokenize(text):
+        terms.append(token)
+        terms.extend(prefix_variants(token))
+    return terms
+
+
+def to_index_text(text: str) -> str:
+    """Analyzed text, ready for to_tsvector('simple', ...)."""
+    return ' '.join(index_terms(text))
+
+
+def to_ts_query(text: str) -> str:
+    """
+    Build a tsquery string for to_tsquery('simple', ...).
+    Every word must match, either as a prefix of an indexed term or through
+    one of its prefix-stripped variants: 'והמחשב' -> ('והמחשב':* | 'המחשב' | 'מחשב').
+    """
+    clauses = []
+    for token in tokenize(text):
+        options = [f"'{token}':*"]
+        options.extend(f"'{variant}'" for variant in prefix_variants(token, MIN_QUERY_STEM))
+        clause = ' | '.join(options)
+        clauses.append(f'({clause})' if len(options) > 1 else clause)
+    return ' & '.join(clauses)
+
+
+def to_exact_ts_query(text: str) -> str:
+    """
+    The words of to_ts_query() as typed (as prefixes), without their
+    prefix-stripped variants: 'מחשב' -> 'מחשב':*. Search ranks the articles
+    this matches above those found only through a stripped stem.
+    """
+    return ' & '.join(f"'{token}':*" for token in tokenize(text))
+
+
+def to_highlight_query(text: str) -> str:
+    """
+    Build a tsquery string for ts_headline over the original (unanalyzed)
+    text that marks the words to_ts_query() finds through the index: each
+    query word (as a prefix) and its prefix-stripped variants, with and
+    without a final letter, also preceded by prefix letters
+    ('בית' marks 'בית', 'בבית' and 'ובבית'; 'והמחשב' also marks 'מחשב').
+    Niqqud is stripped; words are OR-ed, so any of them is marked.
+    """
+    if not text:
+        return ''
+    text = NIQQUD_RE.sub('', unicodedata.normalize('NFC', text))
+    text = ABBREVIATION_MARKS_RE.sub('', text).lower()
+
+    terms = {}
+    for word in TOKEN_RE.findall(text):
+        for stem in [word, *prefix_variants(word, MIN_QUERY_STEM)]:
+            # The query word may be a prefix of longer words; variants are exact, as in to_ts_query()
+            suffix = ':*' if stem == word else ''
+            for form in _final_letter_forms(stem):
+                terms[f"'{form}'{suffix}"] = None
+                for prefix in _highlight_prefixes() if HEBREW_RE.match(form) else ():
+                    terms[f"'{prefix}{form}'{suffix}"] = None
+    return ' | '.join(terms)
+
+
+def _final_letter_forms(word: str) -> list:
+    """The word as written, with its last letter folded and in final form ('מלך' -> ['מלך', 'מלכ'])."""
+    folded = word.translate(FINAL_LETTERS)
+    final = folded[:-1] + FINAL_FORMS.get(folded[-1], folded[-1])
+    return list(dict.fromkeys([word, folded, final]))
+
+
+def _highlight_prefixes() -> list:
+    """Every combination of 1 to MAX_HIGHLIGHT_PREFIX_LENGTH prefix letters."""
+    return [
+        ''.join(letters)
+        for length in range(1, MAX_HIGHLIGHT_PREFIX_LENGTH + 1)
+        for letters in itertools.product(sorted(PREFIX_LETTERS), repeat=length)
+    ]
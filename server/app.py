@@ -9,12 +9,18 @@ import sys
 # Add the server directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, send_from_directory, jsonify
+from datetime import datetime
+from flask import Flask, Response, request, send_from_directory, jsonify
 from flask_cors import CORS
 from config import config
-from db import init_database, seed_default_data, get_pool
+from db import init_database, seed_default_data, get_pool, pool_stats
 from routes import register_blueprints
 from auth import admin_required
+import bulk_export
+import instrumentation
+import json_provider
+import slow_queries
+import metrics
 
 # Initialize Flask app
 app = Flask(__name__, static_folder='..')
@@ -23,6 +29,18 @@ app.config['MAX_CONTENT_LENGTH'] = config.MAX_CONTENT_LENGTH
 # Enable CORS
 CORS(app)
 
+# Fast JSON encoding (see JSON_PROVIDER)
+app.json = json_provider.create_provider(app)
+
+# Per-request query counts and timings (Server-Timing header, query budgets)
+instrumentation.init_app(app)
+
+# Prometheus metrics at /metrics
+metrics.init_app(app)
+
+# Aggregate statements slower than SLOW_QUERY_MS (see /api/admin/slow-queries)
+slow_queries.enable()
+
 # Register all API blueprints
 register_blueprints(app)
 
@@ -102,6 +120,50 @@ def run_migration():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/admin/slow-queries', methods=['GET'])
+@admin_required
+def slow_query_report():
+    """Slow statements grouped by fingerprint with count, p50 and p99, plus sampled EXPLAIN plans (admin only)."""
+    return jsonify(slow_queries.report())
+
+
+@app.route('/api/admin/slow-queries', methods=['DELETE'])
+@admin_required
+def reset_slow_queries():
+    """Clear the slow query log (admin only)."""
+    slow_queries.reset()
+    return jsonify({'success': True})
+
+
+@app.route('/api/admin/export', methods=['GET'])
+@admin_required
+def export_data():
+    """
+    Stream a COPY-based export of the repository (admin only).
+    Query: format=ndjson|csv, tables=articles,tags,... (CSV: one table), gzip=true
+    """
+    try:
+        fmt = request.args.get('format', 'ndjson')
+        tables = bulk_export.resolve_tables(request.args.get('tables', '').split(',') if request.args.get('tables') else None)
+        compress = request.args.get('gzip', '').lower() in ('1', 'true')
+        chunks = bulk_export.stream(tables, fmt, compress)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    mimetypes = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+    response = Response(chunks, mimetype='application/gzip' if compress else mimetypes[fmt])
+    filename = bulk_export.filename(tables, fmt, compress, datetime.now())
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@app.route('/api/admin/db-pool', methods=['GET'])
+@admin_required
+def db_pool_stats():
+    """Connection pool metrics: sizing, checkout waits, exhaustion and connection age (admin only)."""
+    return jsonify(pool_stats())
+
+
 # ==========================================
 # Error Handlers
 # ==========================================
@@ -127,6 +189,7 @@ def server_error(e):
 # Main Entry Point
 # ==========================================
 
+# Development server only; in production run gunicorn -c gunicorn.conf.py app:app
 if __name__ == '__main__':
     # Ensure uploads directory exists
     os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
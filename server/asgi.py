@@ -0,0 +1,116 @@
+"""
+Knowledge Repository - ASGI Server (async mode)
+Read-heavy and upload endpoints run natively on asyncio (routes_async/,
+models_async/, db_async.py); every other route is served by the Flask app
+from app.py in a thread pool, so both modes expose the same API.
+
+    cd server
+    python asgi.py                           # initializes the database, then serves
+    hypercorn asgi:application --bind 0.0.0.0:3000
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the server directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from quart import Quart
+from werkzeug.exceptions import HTTPException
+from hypercorn.asyncio import serve
+from hypercorn.config import Config as HypercornConfig
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from config import config, check_connection_budget
+from db import init_database, seed_default_data
+import db_async
+import json_provider
+from app import app as flask_app
+from routes_async import register_blueprints
+
+# Natively async routes
+async_app = Quart(__name__, static_folder=None)
+async_app.config['MAX_CONTENT_LENGTH'] = config.MAX_CONTENT_LENGTH
+async_app.json = json_provider.create_provider(async_app)
+register_blueprints(async_app)
+
+
+@async_app.before_serving
+async def open_pool():
+    # Native routes use the async pool, the Flask fallback the sync one
+    check_connection_budget(1, config.DB_ASYNC_POOL_MAX + config.DB_POOL_MAX)
+    await db_async.open_pool()
+
+
+@async_app.after_serving
+async def shutdown_pool():
+    await db_async.close_pool()
+
+
+@async_app.after_request
+async def add_cors_headers(response):
+    # Same policy as CORS(app) in app.py; preflights go to the Flask app
+    response.headers.setdefault('Access-Control-Allow-Origin', '*')
+    return response
+
+
+def _flask_fallback(environ, start_response):
+    """
+    The Flask app, always producing at least one body chunk: hypercorn's WSGI
+    wrapper only starts the response on the first chunk, so empty responses
+    (CORS preflights, 204s) would otherwise never be sent.
+    """
+    response = flask_app(environ, start_response)
+    try:
+        empty = True
+        for chunk in response:
+            empty = False
+            yield chunk
+        if empty:
+            yield b''
+    finally:
+        if hasattr(response, 'close'):
+            response.close()
+
+
+# Everything else: the Flask app, run in the event loop's thread pool once the
+# request body has been received in full
+wsgi_app = AsyncioWSGIMiddleware(_flask_fallback, max_body_size=config.MAX_CONTENT_LENGTH)
+
+_async_routes = async_app.url_map.bind('')
+
+
+def _is_async_route(scope):
+    if scope['method'] == 'OPTIONS':
+        return False
+    try:
+        _async_routes.match(scope['path'], method=scope['method'])
+        return True
+    except HTTPException:
+        return False
+
+
+async def application(scope, receive, send):
+    """ASGI entry point: dispatch to the async routes or the Flask app."""
+    if scope['type'] == 'http' and not _is_async_route(scope):
+        await wsgi_app(scope, receive, send)
+    else:
+        await async_app(scope, receive, send)
+
+
+if __name__ == '__main__':
+    os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
+    
+    # Initialize the database once, before serving
+    try:
+        init_database()
+        seed_default_data()
+    except Exception as e:
+        print(f'Failed to initialize database: {e}')
+    
+    hypercorn_config = HypercornConfig()
+    hypercorn_config.bind = [f'0.0.0.0:{config.PORT}']
+    hypercorn_config.accesslog = '-'
+    
+    print(f'Knowledge Repository (async mode) running at http://localhost:{config.PORT}')
+    asyncio.run(serve(application, hypercorn_config))
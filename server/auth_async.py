@@ -0,0 +1,36 @@
+"""
+Authentication decorators for the async (Quart) routes
+Same token checks and responses as the decorators in auth.py
+"""
+
+from functools import wraps
+from quart import request, jsonify, g
+from auth import verify_token
+
+
+def get_current_user():
+    """Get the current authenticated user from the request."""
+    return getattr(g, 'current_user', None)
+
+
+def auth_required(f):
+    """Decorator to require authentication for an async route."""
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        auth_header = request.headers.get('Authorization', '')
+        
+        if not auth_header.startswith('Bearer '):
+            return jsonify({'error': 'Access denied'}), 401
+        
+        payload = verify_token(auth_header[7:])
+        if not payload:
+            return jsonify({'error': 'Invalid or expired token'}), 403
+        
+        g.current_user = {
+            'id': payload.get('id'),
+            'email': payload.get('email'),
+            'role': payload.get('role', 'user')
+        }
+        
+        return await f(*args, **kwargs)
+    return decorated
@@ -0,0 +1,41 @@
+"""
+Backfill derived article fields for Knowledge Repository
+Computes plain text, word count, reading time and excerpt for articles saved
+before they were stored; --all recomputes every article (e.g. after changing
+the excerpt length)
+"""
+
+import argparse
+import os
+import sys
+
+# Add server directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from db import init_database
+from models.articles import Articles
+
+
+def backfill_derived_fields():
+    parser = argparse.ArgumentParser(description='Backfill derived article fields')
+    parser.add_argument('--all', action='store_true', help='recompute every article, not only missing ones')
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+    
+    print('Backfilling derived article fields...')
+    
+    try:
+        init_database()
+        total = Articles.backfill_derived_fields(batch_size=args.batch_size, all_rows=args.all)
+        print(f'Updated {total} articles.')
+        
+    except Exception as e:
+        print(f'Error backfilling derived fields: {e}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    backfill_derived_fields()
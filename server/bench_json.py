@@ -0,0 +1,116 @@
+"""
+JSON encoding benchmark for Knowledge Repository
+Compares Flask's default JSON provider with the fast (orjson) provider on a
+GET /api/articles payload: 10,000 articles with HTML content, tags and
+attachments, as RealDictRow objects with datetime values
+
+    python bench_json.py [--articles 10000] [--repeat 5] [--from-db]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Add server directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from psycopg2.extras import RealDictRow
+from json_provider import FastJSONProvider, orjson
+
+PARAGRAPH = (
+    '<p>מדריך <strong>התקנה</strong> ועבודה עם מערכת הידע של החברה. '
+    'Step-by-step instructions with <a href="https://example.com/docs">links</a>, '
+    '<code>code samples</code> and screenshots.</p>\n'
+)
+
+
+def sample_articles(count):
+    """Synthetic rows shaped like Articles.get_all() output."""
+    now = datetime(2024, 1, 15, 10, 0, 0)
+    articles = []
+    for i in range(count):
+        updated_at = now - timedelta(minutes=i)
+        articles.append(RealDictRow({
+            'id': i + 1,
+            'title': f'מאמר מספר {i + 1}: Knowledge base article',
+            'summary': 'סיכום קצר של המאמר עם Key points and a short description.',
+            'content': PARAGRAPH * 12,
+            'category_id': i % 5 + 1,
+            'department_id': i % 4 + 1,
+            'priority_id': i % 3 + 1,
+            'author': 'author@example.com',
+            'author_id': '1',
+            'views': i * 7,
+            'created_at': updated_at - timedelta(days=30),
+            'updated_at': updated_at,
+            'category_name': 'טכני',
+            'department_name': 'פיתוח',
+            'priority_name': 'רגיל',
+            'priority_color': '#3b82f6',
+            'priority_level': Decimal(i % 3 + 1),
+            'tags': [
+                RealDictRow({'id': t, 'name': f'tag-{t}', 'created_by': None, 'created_at': now})
+                for t in range(i % 4)
+            ],
+            'attachments': [
+                RealDictRow({
+                    'id': i, 'article_id': i + 1, 'file_name': 'guide.pdf',
+                    'mime_type': 'application/pdf', 'size': 52000,
+                    'url': f'/uploads/{i}.pdf', 'created_at': updated_at
+                })
+            ] if i % 3 == 0 else []
+        }))
+    return articles
+
+
+def db_articles():
+    from models.articles import Articles
+    return Articles.get_all()
+
+
+def time_provider(app, provider, articles, repeat):
+    """Median seconds and body size of provider.response(articles), as jsonify() calls it."""
+    timings = []
+    with app.app_context():
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = provider.response(articles).get_data()
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(body)
+
+
+def bench_json():
+    parser = argparse.ArgumentParser(description='Benchmark JSON encoding of GET /api/articles')
+    parser.add_argument('--articles', type=int, default=10000, help='synthetic articles to encode')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per encoder (median is reported)')
+    parser.add_argument('--from-db', action='store_true', help='encode the articles in the database instead')
+    args = parser.parse_args()
+    
+    if orjson is None:
+        print('orjson is not installed; pip install -r requirements.txt')
+        sys.exit(1)
+    
+    articles = db_articles() if args.from_db else sample_articles(args.articles)
+    app = Flask(__name__)
+    
+    print(f'Encoding {len(articles)} articles, median of {args.repeat} runs')
+    default_time, default_size = time_provider(app, DefaultJSONProvider(app), articles, args.repeat)
+    fast_time, fast_size = time_provider(app, FastJSONProvider(app), articles, args.repeat)
+    
+    print(f'{"provider":<10} {"time (ms)":>10} {"size (MB)":>10}')
+    print(f'{"default":<10} {default_time * 1000:>10.1f} {default_size / 1e6:>10.2f}')
+    print(f'{"fast":<10} {fast_time * 1000:>10.1f} {fast_size / 1e6:>10.2f}')
+    print(f'Speedup: {default_time / fast_time:.1f}x')
+
+
+if __name__ == '__main__':
+    bench_json()
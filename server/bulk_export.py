@@ -0,0 +1,116 @@
+"""
+Bulk export for Knowledge Repository
+Streams whole tables with COPY ... TO STDOUT as NDJSON or CSV, optionally
+gzip-compressed, without loading them into memory. All tables are read in one
+repeatable-read snapshot, so an export is consistent.
+"""
+
+import zlib
+import psycopg
+from config import config
+from models.articles import Articles
+
+FORMATS = ('ndjson', 'csv')
+
+# Stored article columns with the body after the summary; derived ones
+# (search_vector, Articles.DERIVED_COLUMNS, plain_content) are left out
+_ARTICLE_COLUMNS = ', '.join(
+    'b.content' if c == 'content' else f'a.{c}'
+    for c in Articles.COLUMNS[:3] + Articles.BODY_COLUMNS + Articles.COLUMNS[3:]
+    if c not in Articles.DERIVED_COLUMNS
+)
+
+# Exported tables in dependency order
+TABLE_QUERIES = {
+    'categories': 'SELECT * FROM categories ORDER BY id',
+    'departments': 'SELECT * FROM departments ORDER BY id',
+    'priorities': 'SELECT * FROM priorities ORDER BY id',
+    'tags': 'SELECT * FROM tags ORDER BY id',
+    'articles': f'SELECT {_ARTICLE_COLUMNS} FROM articles a {Articles.BODY_JOIN_SQL} ORDER BY a.id',
+    'article_tags': 'SELECT * FROM article_tags ORDER BY article_id, tag_id',
+    'attachments': 'SELECT * FROM attachments ORDER BY id'
+}
+
+# Output is flushed in chunks of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+
+def resolve_tables(names=None):
+    """Validate a list of table names (None = all), keeping export order."""
+    if not names:
+        return list(TABLE_QUERIES)
+    unknown = set(names) - set(TABLE_QUERIES)
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(sorted(unknown))}")
+    return [table for table in TABLE_QUERIES if table in names]
+
+
+def copy_sql(table, fmt):
+    """
+    COPY statement for one table.
+    
+    NDJSON lines are {"table": ..., "row": {...}}. They are produced in CSV
+    mode with control characters as quote and delimiter: JSON never contains
+    them unescaped, so each line is written verbatim (text mode would
+    backslash-escape the JSON).
+    """
+    select = TABLE_QUERIES[table]
+    if fmt == 'csv':
+        return f'COPY ({select}) TO STDOUT WITH (FORMAT csv, HEADER)'
+    return f"""
+        COPY (
+            SELECT json_build_object('table', '{table}', 'row', row_to_json(t))
+            FROM ({select}) t
+        ) TO STDOUT WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')
+    """
+
+
+def stream(tables=None, fmt='ndjson', compress=False):
+    """
+    Yield the export as bytes chunks. CSV has one header row per table, so
+    CSV exports take exactly one table.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    tables = resolve_tables(tables)
+    if fmt == 'csv' and len(tables) != 1:
+        raise ValueError('CSV exports take exactly one table')
+    return _generate(tables, fmt, compress)
+
+
+def _generate(tables, fmt, compress):
+    # gzip container (wbits=31), compressed as it streams
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = bytearray()
+    
+    def flush():
+        data = bytes(buffer)
+        buffer.clear()
+        return compressor.compress(data) if compressor else data
+    
+    # A dedicated connection: COPY can hold it for minutes on a large repository
+    with psycopg.connect(config.DATABASE_URL) as conn:
+        conn.isolation_level = psycopg.IsolationLevel.REPEATABLE_READ
+        conn.read_only = True
+        with conn.cursor() as cur:
+            for table in tables:
+                with cur.copy(copy_sql(table, fmt)) as copy:
+                    for data in copy:
+                        buffer += data
+                        if len(buffer) >= CHUNK_SIZE:
+                            chunk = flush()
+                            if chunk:
+                                yield chunk
+        conn.rollback()
+    
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def filename(tables, fmt, compress, timestamp):
+    """Download name, e.g. knowledge-repo-20240115-100000.ndjson.gz or articles-....csv."""
+    prefix = tables[0] if fmt == 'csv' else 'knowledge-repo'
+    return f"{prefix}-{timestamp:%Y%m%d-%H%M%S}.{fmt}{'.gz' if compress else ''}"
@@ -0,0 +1,253 @@
+"""
+Bulk import for Knowledge Repository
+Loads many articles at once: rows are validated as they are read, staged with
+COPY ... FROM STDIN into a temporary table, and taxonomy names and tags are
+resolved with set-based statements. Everything valid is inserted in one
+transaction; invalid rows are reported by their position in the input.
+"""
+
+import json
+from datetime import datetime, timezone
+import cache
+import inline_images
+from db import query, copy_from, transaction
+from models.articles import Articles
+
+# (name column, id column, table) for taxonomies given by name or id
+TAXONOMIES = (
+    ('category', 'category_id', 'categories'),
+    ('department', 'department_id', 'departments'),
+    ('priority', 'priority_id', 'priorities')
+)
+
+# Columns of the staging table filled by COPY, in order
+STAGED_COLUMNS = (
+    'line', 'title', 'summary', 'content', 'plain_content', 'word_count', 'reading_minutes', 'excerpt',
+    'category_id', 'category', 'department_id', 'department', 'priority_id', 'priority',
+    'tags', 'created_at', 'updated_at', 'index_title', 'index_summary', 'index_content'
+)
+
+CREATE_STAGING_SQL = """
+    CREATE TEMP TABLE article_import (
+        line INTEGER PRIMARY KEY,
+        id INTEGER,
+        title TEXT NOT NULL,
+        summary TEXT,
+        content TEXT,
+        plain_content TEXT,
+        word_count INTEGER,
+        reading_minutes INTEGER,
+        excerpt TEXT,
+        category_id INTEGER,
+        category TEXT,
+        department_id INTEGER,
+        department TEXT,
+        priority_id INTEGER,
+        priority TEXT,
+        tags JSONB NOT NULL,
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP,
+        index_title TEXT,
+        index_summary TEXT,
+        index_content TEXT
+    ) ON COMMIT DROP
+"""
+
+COPY_SQL = f"COPY article_import ({', '.join(STAGED_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+
+def import_articles(rows, author=None, author_id=None):
+    """
+    Import articles from an iterable of dicts, or of NDJSON lines (bytes)
+    that are decoded one at a time; blank lines are skipped but still
+    counted, so indexes are the (0-based) line numbers of the input.
+    
+    Each row takes the fields of POST /api/articles, plus taxonomy names
+    (category, department, priority) instead of ids, and optional created_at /
+    updated_at ISO timestamps to keep the dates of migrated content.
+    
+    Returns {'created': [{'index', 'id'}, ...], 'errors': [{'index', 'error'}, ...]}.
+    """
+    errors = []
+    
+    with transaction():
+        query(CREATE_STAGING_SQL)
+        copy_from(COPY_SQL, _staged_lines(rows, errors))
+        
+        # Names -> ids for every taxonomy in one pass; unknown names stay NULL
+        query(f"""
+            UPDATE article_import i SET {', '.join(
+                f"{id_column} = coalesce(i.{id_column}, (SELECT t.id FROM {table} t WHERE t.name = i.{name_column}))"
+                for name_column, id_column, table in TAXONOMIES
+            )}
+            WHERE {' OR '.join(f'i.{name_column} IS NOT NULL' for name_column, _, _ in TAXONOMIES)}
+        """)
+        
+        # Rows naming unknown taxonomies (or ids) are reported and dropped
+        problems = []
+        for name_column, id_column, table in TAXONOMIES:
+            problems.append(f"""
+                CASE
+                    WHEN i.{id_column} IS NULL AND i.{name_column} IS NOT NULL
+                        THEN 'Unknown {name_column}: ' || i.{name_column}
+                    WHEN i.{id_column} IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {table} t WHERE t.id = i.{id_column})
+                        THEN 'Unknown {id_column}: ' || i.{id_column}
+                END
+            """)
+        result = query(f"""
+            WITH invalid AS (
+                SELECT line, concat_ws('; ', {', '.join(problems)}) AS error
+                FROM article_import i
+            )
+            DELETE FROM article_import i USING invalid
+            WHERE i.line = invalid.line AND invalid.error <> ''
+            RETURNING i.line, invalid.error
+        """)
+        errors.extend({'index': row['line'], 'error': row['error']} for row in result['rows'])
+        
+        # Reserve article ids in input order so rows can be linked to their tags
+        query("""
+            UPDATE article_import i SET id = n.id
+            FROM (
+                SELECT line, nextval(pg_get_serial_sequence('articles', 'id')) AS id
+                FROM (SELECT line FROM article_import ORDER BY line) ordered
+            ) n
+            WHERE i.line = n.line
+        """)
+        
+        result = query("""
+            INSERT INTO tags (name, created_by)
+            SELECT DISTINCT name, %s
+            FROM article_import i CROSS JOIN LATERAL jsonb_array_elements_text(i.tags) AS tag(name)
+            ORDER BY name
+            ON CONFLICT (name) DO NOTHING
+        """, (author_id,))
+        if result['rowcount']:
+            cache.invalidate('tags')
+        
+        query(f"""
+            INSERT INTO articles (
+                id, title, summary, word_count, reading_minutes, excerpt,
+                category_id, department_id, priority_id, author, author_id, search_vector,
+                created_at, updated_at
+            )
+            SELECT
+                i.id, i.title, i.summary, i.word_count, i.reading_minutes, i.excerpt,
+                i.category_id, i.department_id, i.priority_id,
+                %s, %s,
+                {Articles.SEARCH_VECTOR_SQL % ('i.index_title', 'i.index_summary', 'i.index_content')},
+                coalesce(i.created_at, CURRENT_TIMESTAMP),
+                coalesce(i.updated_at, i.created_at, CURRENT_TIMESTAMP)
+            FROM article_import i
+            ORDER BY i.line
+        """, (author, author_id))
+        
+        query("""
+            INSERT INTO article_bodies (article_id, content, plain_content)
+            SELECT id, content, plain_content FROM article_import
+        """)
+        
+        query("""
+            INSERT INTO article_tags (article_id, tag_id)
+            SELECT DISTINCT i.id, t.id
+            FROM article_import i
+            CROSS JOIN LATERAL jsonb_array_elements_text(i.tags) AS tag(name)
+            JOIN tags t ON t.name = tag.name
+        """)
+        
+        result = query('SELECT line, id FROM article_import ORDER BY line')
+    
+    errors.sort(key=lambda error: error['index'])
+    return {
+        'created': [{'index': row['line'], 'id': row['id']} for row in result['rows']],
+        'errors': errors
+    }
+
+
+def _staged_lines(rows, errors):
+    """CSV lines for COPY, one per valid row; invalid rows are added to errors."""
+    for index, row in enumerate(rows):
+        if isinstance(row, bytes) and not row.strip():
+            continue
+        try:
+            values = (index, *_staged_values(row))
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+            continue
+        
+        yield (','.join(map(_csv_field, values)) + '\n').encode('utf-8')
+
+
+def _csv_field(value):
+    """Unquoted empty is NULL in COPY's CSV format; text is always quoted."""
+    if value is None:
+        return ''
+    if isinstance(value, int):
+        return str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _staged_values(row):
+    """Validate one input row and return its staging columns after line (see STAGED_COLUMNS)."""
+    if isinstance(row, bytes):
+        try:
+            row = json.loads(row)
+        except ValueError:
+            raise ValueError('Invalid JSON')
+    if not isinstance(row, dict):
+        raise ValueError('Row must be a JSON object')
+    
+    title = row.get('title')
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError('Title is required')
+    
+    summary = _text(row, 'summary')
+    content = inline_images.extract(_text(row, 'content'))
+    
+    taxonomy = []
+    for name_column, id_column, _ in TAXONOMIES:
+        taxonomy.append(_id(row, id_column))
+        taxonomy.append(_text(row, name_column))
+    
+    tags = row.get('tags') or []
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise ValueError('tags must be a list of names')
+    tags = list(dict.fromkeys(tag.strip() for tag in tags if tag.strip()))
+    
+    derived = Articles._derived_fields(content)
+    return (
+        title, summary, content, *derived, *taxonomy, json.dumps(tags),
+        _timestamp(row, 'created_at'), _timestamp(row, 'updated_at'),
+        *Articles._search_document(title, summary, derived[0])
+    )
+
+
+def _text(row, key):
+    value = row.get(key)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f'{key} must be a string')
+    return value
+
+
+def _id(row, key):
+    value = row.get(key)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{key} must be an integer')
+
+
+def _timestamp(row, key):
+    value = row.get(key)
+    if value is None:
+        return None
+    try:
+        timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise ValueError(f'{key} must be an ISO 8601 timestamp')
+    # Timestamps are stored as naive UTC
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp.isoformat()
@@ -0,0 +1,113 @@
+"""
+In-process read-through cache for Knowledge Repository taxonomies
+(categories, departments, priorities, tags)
+
+Each cache name carries a version that is bumped on invalidation, so a value
+loaded before an invalidation is not kept. Entries also expire after
+CACHE_TTL_SECONDS, which bounds how long other worker processes can serve data
+invalidated elsewhere. ETags are a hash of the value, so every worker and
+every reload gives unchanged data the same ETag.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from flask import request, jsonify, make_response
+from config import config
+from db import on_commit
+
+_lock = threading.Lock()
+_entries = {}   # name -> (value, loaded_at, etag)
+_versions = {}  # name -> int
+_hits = {}      # name -> served from cache (including 304s)
+_misses = {}    # name -> loaded from the database
+
+
+def version(name):
+    """Current version of a cache name."""
+    return _versions.get(name, 0)
+
+
+def _fresh_entry(name):
+    entry = _entries.get(name)
+    if entry and time.monotonic() - entry[1] < config.CACHE_TTL_SECONDS:
+        return entry
+    return None
+
+
+def stats():
+    """Hit and miss counts per cache name."""
+    return {
+        name: {'hits': _hits.get(name, 0), 'misses': _misses.get(name, 0)}
+        for name in set(_hits) | set(_misses)
+    }
+
+
+def _count(counts, name):
+    with _lock:
+        counts[name] = counts.get(name, 0) + 1
+
+
+def _load(name, loader):
+    _count(_misses, name)
+    current = version(name)
+    value = loader()
+    entry = (value, time.monotonic(), _etag(name, value))
+    with _lock:
+        # Don't store a value that was invalidated while it was loading
+        if version(name) == current:
+            _entries[name] = entry
+    return entry
+
+
+def _etag(name, value):
+    """ETag derived from the content, identical in every process."""
+    serialized = json.dumps(value, sort_keys=True, default=str, separators=(',', ':'))
+    return f"{name}-{hashlib.sha256(serialized.encode('utf-8')).hexdigest()[:32]}"
+
+
+def get_or_load(name, loader):
+    """Return the cached value for name, calling loader() on a miss."""
+    return _get_entry(name, loader)[0]
+
+
+def _get_entry(name, loader):
+    entry = _fresh_entry(name)
+    if entry:
+        _count(_hits, name)
+        return entry
+    return _load(name, loader)
+
+
+def invalidate(name):
+    """
+    Drop the cached value and bump the version of a cache name.
+    Inside a transaction this happens again after commit, so a reload that
+    raced with the uncommitted write is not kept.
+    """
+    _invalidate(name)
+    on_commit(lambda: _invalidate(name))
+
+
+def _invalidate(name):
+    with _lock:
+        _versions[name] = version(name) + 1
+        _entries.pop(name, None)
+
+
+def conditional_response(name, loader):
+    """
+    JSON response for a cached collection, with an ETag.
+    Returns 304 without touching the database when the client's copy is current.
+    """
+    entry = _get_entry(name, loader)
+    if request.if_none_match.contains(entry[2]):
+        response = make_response('', 304)
+    else:
+        response = jsonify(entry[0])
+
+    # Browsers revalidate on every load, so invalidations show up immediately
+    response.set_etag(entry[2])
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -15,6 +15,17 @@ class Config:
     # Database
     DATABASE_URL = os.getenv('DATABASE_URL', 'postgresql://localhost/knowledge_repo')
     
+    # Connection pool (per worker process)
+    DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '1'))
+    DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '10'))
+    DB_POOL_TIMEOUT_SECONDS = float(os.getenv('DB_POOL_TIMEOUT_SECONDS', '10'))
+    DB_POOL_MAX_AGE_SECONDS = float(os.getenv('DB_POOL_MAX_AGE_SECONDS', '1800'))
+    DB_POOL_HEALTH_CHECK_SECONDS = float(os.getenv('DB_POOL_HEALTH_CHECK_SECONDS', '30'))
+    
+    # Async pool used by the ASGI server (asgi.py); one per process
+    DB_ASYNC_POOL_MIN = int(os.getenv('DB_ASYNC_POOL_MIN', '2'))
+    DB_ASYNC_POOL_MAX = int(os.getenv('DB_ASYNC_POOL_MAX', '20'))
+    
     # JWT Secret - use env variable or generate a secure random one
     JWT_SECRET = os.getenv('JWT_SECRET', secrets.token_hex(64))
     JWT_EXPIRY_HOURS = int(os.getenv('JWT_EXPIRY_HOURS', '24'))
@@ -23,10 +34,58 @@ class Config:
     PORT = int(os.getenv('PORT', '3000'))
     DEBUG = os.getenv('DEBUG', 'false').lower() == 'true'
     
+    # Connections this server may hold, its share of PostgreSQL's
+    # max_connections (100 by default) after headroom for admin exports,
+    # maintenance and other clients; checked at startup (check_connection_budget)
+    DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', '80'))
+    
+    # Production server (gunicorn.conf.py): worker processes and threads per
+    # worker. Each worker has its own pool, so keep DB_POOL_MAX >= WEB_THREADS;
+    # by default workers are bounded so that all their pools fit the budget.
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', str(max(1, min(
+        (os.cpu_count() or 1) * 2 + 1,
+        DB_MAX_CONNECTIONS // DB_POOL_MAX
+    )))))
+    WEB_THREADS = int(os.getenv('WEB_THREADS', '4'))
+    WEB_TIMEOUT_SECONDS = int(os.getenv('WEB_TIMEOUT_SECONDS', '30'))
+    
+    # JSON responses: 'fast' (orjson, ISO 8601 timestamps) or 'default' (Flask's encoder)
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'fast')
+    
+    # Request instrumentation: log every request as JSON, and the default
+    # per-request SQL statement budget (0 = only endpoints with @query_budget)
+    REQUEST_LOG = os.getenv('REQUEST_LOG', 'false').lower() == 'true'
+    QUERY_BUDGET = int(os.getenv('QUERY_BUDGET', '0'))
+    
+    # Slow query log: statements over SLOW_QUERY_MS (0 = off) are aggregated by
+    # fingerprint; a sample of slow SELECTs gets EXPLAIN (ANALYZE, BUFFERS)
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+    SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv('SLOW_QUERY_EXPLAIN_SAMPLE', '0'))
+    SLOW_QUERY_EXPLAIN_BUFFER = int(os.getenv('SLOW_QUERY_EXPLAIN_BUFFER', '20'))
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', '5000'))
+    
+    # Taxonomy cache (categories, departments, priorities, tags)
+    CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', '60'))
+    
+    # View events (write-behind article view counts)
+    VIEW_FLUSH_INTERVAL_SECONDS = float(os.getenv('VIEW_FLUSH_INTERVAL_SECONDS', '5'))
+    VIEW_FLUSH_MAX_PENDING = int(os.getenv('VIEW_FLUSH_MAX_PENDING', '1000'))
+    
+    # Prometheus metrics: how often each worker refreshes its pool and cache
+    # gauges when /metrics aggregates several workers (PROMETHEUS_MULTIPROC_DIR)
+    METRICS_REFRESH_SECONDS = float(os.getenv('METRICS_REFRESH_SECONDS', '15'))
+    
     # File uploads
     UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
     MAX_CONTENT_LENGTH = 20 * 1024 * 1024  # 20MB max file size
     
+    # Document import (POST /api/import): conversion processes per server
+    # process, conversions queued or running at once, and the per-request deadline
+    CONVERT_WORKERS = int(os.getenv('CONVERT_WORKERS', str(min(4, os.cpu_count() or 1))))
+    CONVERT_MAX_PENDING = int(os.getenv('CONVERT_MAX_PENDING', str(CONVERT_WORKERS * 4)))
+    CONVERT_TIMEOUT_SECONDS = float(os.getenv('CONVERT_TIMEOUT_SECONDS', '60'))
+    CONVERT_MAX_TASKS_PER_CHILD = int(os.getenv('CONVERT_MAX_TASKS_PER_CHILD', '100'))
+    
     # S3 (optional)
     S3_BUCKET = os.getenv('S3_BUCKET')
     S3_REGION = os.getenv('S3_REGION', 'us-east-1')
@@ -36,3 +95,15 @@ class Config:
 
 
 config = Config()
+
+
+def check_connection_budget(processes, connections_per_process):
+    """Raise ValueError if the server could open more than DB_MAX_CONNECTIONS connections."""
+    needed = processes * connections_per_process
+    if needed > config.DB_MAX_CONNECTIONS:
+        raise ValueError(
+            f'{processes} process(es) × {connections_per_process} pooled connections = {needed} '
+            f'database connections, over DB_MAX_CONNECTIONS ({config.DB_MAX_CONNECTIONS}); '
+            'lower WEB_CONCURRENCY or the pool sizes, or raise DB_MAX_CONNECTIONS '
+            "(and PostgreSQL's max_connections)"
+        )
@@ -0,0 +1,221 @@
+"""
+Instrumented PostgreSQL connection pool for Knowledge Repository
+Bounded-wait checkout, health checks, age-based recycling and metrics
+"""
+
+import threading
+import time
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError
+
+
+class PoolTimeout(PoolError):
+    """No connection became available within the checkout timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool that queues callers when exhausted instead of failing.
+
+    - getconn() waits up to `timeout` seconds for a free connection
+    - connections idle for `health_check_after` seconds are pinged before reuse
+    - connections older than `max_age` seconds are closed and replaced
+    """
+
+    def __init__(self, connect, minconn=1, maxconn=10, timeout=10.0,
+                 max_age=1800.0, health_check_after=30.0):
+        self._connect = connect
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_age = max_age
+        self.health_check_after = health_check_after
+
+        self._cond = threading.Condition()
+        self._idle = []        # [(conn, returned_at)], most recently returned last
+        self._in_use = set()
+        self._connecting = 0   # slots reserved by getconn() while it connects
+        self._created_at = {}  # conn -> time.monotonic() at creation
+        self._waiting = 0
+        self._closed = False
+
+        self._stats = {
+            'checkouts': 0,
+            'exhausted': 0,
+            'timeouts': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0,
+            'connections_created': 0,
+            'connections_recycled': 0,
+            'health_check_failures': 0
+        }
+
+        with self._cond:
+            for _ in range(minconn):
+                self._idle.append((self._new_connection(), time.monotonic()))
+
+    def getconn(self, timeout=None):
+        """Check out a connection, waiting up to timeout seconds (pool default if None)."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            if self._closed:
+                raise PoolError('connection pool is closed')
+
+            if not self._idle and len(self._in_use) + self._connecting >= self.maxconn:
+                self._stats['exhausted'] += 1
+
+            while not self._idle and len(self._in_use) + self._connecting >= self.maxconn:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'no database connection available within {timeout:.1f}s '
+                        f'({self.maxconn} in use)'
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            if self._idle:
+                conn, returned_at = self._idle.pop()
+                self._in_use.add(conn)
+            else:
+                # Reserve the slot; connecting is slow, so it runs unlocked below
+                conn = None
+                self._connecting += 1
+
+            waited = time.monotonic() - started
+            self._stats['checkouts'] += 1
+            self._stats['wait_seconds_total'] += waited
+            self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], waited)
+
+        if conn is None:
+            return self._open_reserved()
+
+        # Recycling and health checks talk to the server, so run them unlocked
+        try:
+            return self._validate(conn, returned_at)
+        except Exception:
+            with self._cond:
+                self._discard(conn)
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn, close=False):
+        """Return a connection; broken, closed or expired connections are dropped."""
+        if not close and not conn.closed:
+            try:
+                if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                close = True
+
+        with self._cond:
+            if conn not in self._in_use:
+                raise PoolError("trying to put unkeyed connection")
+            self._in_use.discard(conn)
+
+            if close or conn.closed or self._closed or self._age(conn) > self.max_age:
+                if not (close or conn.closed or self._closed):
+                    self._stats['connections_recycled'] += 1
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection; in-use ones are closed when returned."""
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._discard(conn)
+            self._idle = []
+            self._cond.notify_all()
+
+    def stats(self):
+        """Snapshot of pool sizing, wait and connection-age metrics."""
+        with self._cond:
+            now = time.monotonic()
+            ages = [now - created for created in self._created_at.values()]
+            return {
+                **self._stats,
+                'size': len(self._created_at),
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'min': self.minconn,
+                'max': self.maxconn,
+                'connection_age_seconds_max': max(ages, default=0.0),
+                'connection_age_seconds_avg': sum(ages) / len(ages) if ages else 0.0
+            }
+
+    def _validate(self, conn, returned_at):
+        """Replace expired connections and ping ones that sat idle for a while."""
+        if conn.closed or self._age(conn) > self.max_age:
+            with self._cond:
+                self._stats['connections_recycled'] += 1
+            return self._replace(conn)
+
+        if time.monotonic() - returned_at > self.health_check_after:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT 1')
+                conn.rollback()
+            except psycopg2.Error:
+                with self._cond:
+                    self._stats['health_check_failures'] += 1
+                return self._replace(conn)
+
+        return conn
+
+    def _replace(self, conn):
+        fresh = self._connect()
+        with self._cond:
+            self._in_use.discard(conn)
+            self._discard(conn)
+            self._created_at[fresh] = time.monotonic()
+            self._stats['connections_created'] += 1
+            self._in_use.add(fresh)
+        return fresh
+
+    def _open_reserved(self):
+        """Connect for a slot reserved by getconn() and check the connection out."""
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._connecting -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._connecting -= 1
+            self._created_at[conn] = time.monotonic()
+            self._stats['connections_created'] += 1
+            self._in_use.add(conn)
+        return conn
+
+    def _new_connection(self):
+        conn = self._connect()
+        self._created_at[conn] = time.monotonic()
+        self._stats['connections_created'] += 1
+        return conn
+
+    def _discard(self, conn):
+        self._created_at.pop(conn, None)
+        self._in_use.discard(conn)
+        if not conn.closed:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+
+    def _age(self, conn):
+        created = self._created_at.get(conn)
+        return time.monotonic() - created if created is not None else 0.0
@@ -0,0 +1,344 @@
+"""
+Document conversion for Knowledge Repository
+Converts uploaded DOCX, HTML and Markdown files to normalized article HTML in a
+bounded pool of worker processes, so large documents use other cores instead
+of holding request threads. Embedded images are returned as bytes, with
+placeholders in the HTML, for the caller to store as uploads.
+"""
+
+import base64
+import binascii
+import hashlib
+import html
+import io
+import multiprocessing
+import os
+import re
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from html.parser import HTMLParser
+from config import config
+
+# File extension -> format
+FORMATS = {
+    '.docx': 'docx',
+    '.html': 'html',
+    '.htm': 'html',
+    '.md': 'markdown',
+    '.markdown': 'markdown',
+    '.txt': 'markdown'
+}
+
+SUMMARY_LENGTH = 200
+
+# src of the N-th extracted image until the caller has stored it
+IMAGE_PLACEHOLDER = 'import-image:{}'
+
+# Elements dropped together with their content
+_DROPPED_ELEMENTS = {
+    'script', 'style', 'head', 'title', 'noscript', 'template', 'iframe',
+    'object', 'embed', 'frame', 'frameset', 'applet', 'form', 'svg', 'math'
+}
+
+# Wrapper and metadata elements dropped, keeping their content
+_UNWRAPPED_ELEMENTS = {'html', 'body', 'meta', 'link', 'base', 'input', 'button', 'select', 'textarea'}
+
+_VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr'
+}
+
+_URL_ATTRIBUTES = {'href', 'src', 'action', 'formaction', 'background', 'poster', 'xlink:href'}
+
+_DATA_URI_RE = re.compile(r'^data:(image/[\w.+-]+);base64,(.*)$', re.IGNORECASE | re.DOTALL)
+
+_SPACE_RE = re.compile(r'\s+')
+_TAG_RE = re.compile(r'<[^>]*>')
+_H1_RE = re.compile(r'<h1[^>]*>.*?</h1>', re.DOTALL)
+
+# Worker pool, owned by the process that created it (as db.get_pool)
+_executor = None
+_executor_pid = None
+_slots = None
+_lock = threading.Lock()
+
+
+class ConverterBusy(Exception):
+    """Raised when CONVERT_MAX_PENDING conversions are already queued or running."""
+
+
+def detect_format(filename):
+    """Format for a file name ('docx', 'html' or 'markdown'), or None if unsupported."""
+    return FORMATS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def convert_many(files):
+    """
+    Convert [(filename, bytes), ...] in parallel in the worker pool.
+    
+    Returns one dict per file, in order: {'fileName', 'title', 'summary',
+    'html', 'images': [(mime_type, bytes), ...]} or {'fileName', 'error'}.
+    All files share one CONVERT_TIMEOUT_SECONDS deadline, which the workers
+    enforce too (see _convert_until), so a stuck conversion frees its worker.
+    Raises ConverterBusy, before submitting anything, if the pool cannot take
+    all the files.
+    """
+    executor, slots = _get_executor()
+    supported = sum(1 for filename, _ in files if detect_format(filename))
+    
+    acquired = 0
+    try:
+        for _ in range(supported):
+            if not slots.acquire(blocking=False):
+                raise ConverterBusy('Too many documents are being converted, try again shortly')
+            acquired += 1
+    except ConverterBusy:
+        for _ in range(acquired):
+            slots.release()
+        raise
+    
+    # Wall-clock time, so the worker processes can check it too
+    deadline = time.time() + config.CONVERT_TIMEOUT_SECONDS
+    futures = []
+    for filename, data in files:
+        future = None
+        if detect_format(filename):
+            future = executor.submit(_convert_until, deadline, filename, data)
+            future.add_done_callback(lambda _: slots.release())
+        futures.append(future)
+    
+    results = []
+    for (filename, _), future in zip(files, futures):
+        if future is None:
+            results.append({'fileName': filename, 'error': 'Unsupported file type; use DOCX, HTML or Markdown/TXT'})
+            continue
+        try:
+            results.append({'fileName': filename, **future.result(timeout=max(0, deadline - time.time()))})
+        except TimeoutError:
+            # Still queued: never runs; running: its worker stops at the deadline
+            future.cancel()
+            results.append({'fileName': filename, 'error': 'Conversion timed out'})
+        except Exception as e:
+            results.append({'fileName': filename, 'error': f'Conversion failed: {e}'})
+    
+    return results
+
+
+def shutdown():
+    """Stop this process's worker pool, e.g. when a server worker exits."""
+    global _executor, _executor_pid
+    with _lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _executor_pid = None
+
+
+def _get_executor():
+    """Get or create this process's worker pool (a fresh one after a fork)."""
+    global _executor, _executor_pid, _slots
+    with _lock:
+        if _executor is None or _executor_pid != os.getpid():
+            # Spawned, not forked: server processes run threads and hold
+            # database connections that a forked child must not inherit
+            _executor = ProcessPoolExecutor(
+                max_workers=config.CONVERT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                max_tasks_per_child=config.CONVERT_MAX_TASKS_PER_CHILD
+            )
+            _executor_pid = os.getpid()
+            _slots = threading.BoundedSemaphore(config.CONVERT_MAX_PENDING)
+        return _executor, _slots
+
+
+def _convert_until(deadline, filename, data):
+    """
+    convert() in a worker process, raising TimeoutError at deadline (a
+    time.time() value), so a stuck conversion doesn't hold the worker and its
+    slot for good. Without interval timers (Windows) only the start is checked.
+    """
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise TimeoutError('Conversion timed out')
+    if not hasattr(signal, 'setitimer'):
+        return convert(filename, data)
+    
+    def expire(signum, frame):
+        raise TimeoutError('Conversion timed out')
+    
+    # Tasks run on the worker's main thread, which receives the signal
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        return convert(filename, data)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def convert(filename, data):
+    """Convert one document (runs in a worker process); see convert_many()."""
+    fmt = detect_format(filename)
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    
+    if fmt == 'docx':
+        import mammoth
+        # Images are inlined as data: URIs and extracted by the normalizer
+        raw_html = mammoth.convert_to_html(io.BytesIO(data)).value
+    elif fmt == 'markdown':
+        import markdown
+        raw_html = markdown.markdown(_decode(data), extensions=['extra', 'sane_lists'])
+    else:
+        raw_html = _decode(data)
+    
+    normalizer = _Normalizer()
+    normalizer.feed(raw_html)
+    normalizer.close()
+    
+    content = normalizer.html()
+    
+    # Word documents rarely use Heading 1 as the document title
+    title = stem if fmt == 'docx' else (normalizer.heading or normalizer.title or stem)
+    
+    # Summary: the start of the text, without the heading used as title
+    text = _TAG_RE.sub(' ', _H1_RE.sub(' ', content, count=1) if normalizer.heading else content)
+    summary = _SPACE_RE.sub(' ', html.unescape(text)).strip()[:SUMMARY_LENGTH]
+    
+    return {
+        'title': _SPACE_RE.sub(' ', title).strip(),
+        'summary': summary,
+        'html': content,
+        'images': normalizer.images
+    }
+
+
+def _decode(data):
+    if data.startswith(b'\xef\xbb\xbf'):
+        data = data[3:]
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('cp1255', errors='replace')  # legacy Hebrew Windows files
+
+
+class _Normalizer(HTMLParser):
+    """
+    Re-serializes HTML as article content: only the <main> element (or the
+    body), without scripts, event handlers, javascript: URLs and comments,
+    with embedded data: URI images replaced by placeholders and other data:
+    URLs (e.g. links to embedded files) removed.
+    """
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.images = []
+        self.title = None
+        self.heading = None
+        self._image_index = {}  # sha256 -> placeholder index
+        self._dropped_depth = 0
+        self._in_title = False
+        self._heading_text = None
+        self._main = None  # [start, end] output positions of the first <main>
+        self._main_depth = 0
+    
+    def html(self):
+        out = self.out
+        if self._main is not None:
+            out = out[self._main[0]:self._main[1]]
+        return ''.join(out).strip()
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title':
+            self._in_title = True
+            self.title = ''
+        if self._dropped_depth or tag in _DROPPED_ELEMENTS:
+            if tag not in _VOID_ELEMENTS:
+                self._dropped_depth += 1
+            return
+        if tag == 'main':
+            if self._main is None:
+                self._main = [len(self.out), None]
+                self._main_depth = 1
+            elif self._main[1] is None:
+                self._main_depth += 1
+            return
+        if tag in _UNWRAPPED_ELEMENTS:
+            return
+        if tag == 'h1' and self.heading is None:
+            self._heading_text = []
+        
+        self.out.append(f'<{tag}{self._attributes(tag, attrs)}>')
+    
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_ELEMENTS:
+            self.handle_endtag(tag)
+    
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        if self._dropped_depth:
+            if tag not in _VOID_ELEMENTS:
+                self._dropped_depth -= 1
+            return
+        if tag == 'main':
+            if self._main is not None and self._main[1] is None:
+                self._main_depth -= 1
+                if self._main_depth == 0:
+                    self._main[1] = len(self.out)
+            return
+        if tag in _UNWRAPPED_ELEMENTS or tag in _VOID_ELEMENTS:
+            return
+        if tag == 'h1' and self._heading_text is not None:
+            self.heading = ''.join(self._heading_text)
+            self._heading_text = None
+        
+        self.out.append(f'</{tag}>')
+    
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        if self._dropped_depth:
+            return
+        if self._heading_text is not None:
+            self._heading_text.append(data)
+        self.out.append(html.escape(data, quote=False))
+    
+    def _attributes(self, tag, attrs):
+        serialized = []
+        for name, value in attrs:
+            value = value or ''
+            if name.startswith('on'):
+                continue
+            if name in _URL_ATTRIBUTES:
+                scheme = re.sub(r'[\s\x00-\x1f]', '', value).lower()
+                if scheme.startswith(('javascript:', 'vbscript:')):
+                    continue
+                if scheme.startswith('data:'):
+                    # Only <img src> images are kept, as uploads
+                    if tag != 'img' or name != 'src':
+                        continue
+                    value = self._extract_image(value)
+                    if value is None:
+                        continue
+            serialized.append(f' {name}="{html.escape(value)}"')
+        return ''.join(serialized)
+    
+    def _extract_image(self, uri):
+        """Placeholder for a data: URI image (identical images share one), or None if invalid."""
+        match = _DATA_URI_RE.match(uri)
+        if not match:
+            return None
+        try:
+            data = base64.b64decode(re.sub(r'\s', '', match.group(2)), validate=True)
+        except (binascii.Error, ValueError):
+            return None
+        
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in self._image_index:
+            self._image_index[digest] = len(self.images)
+            self.images.append((match.group(1).lower(), data))
+        return IMAGE_PLACEHOLDER.format(self._image_index[digest])
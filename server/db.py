@@ -3,18 +3,102 @@ Database connection and initialization for Knowledge Repository
 PostgreSQL using psycopg2
 """
 
+import os
+import re
+import time
+import itertools
+import dataclasses
+import functools
 import psycopg2
-from psycopg2 import pool
+import psycopg2.errors
+import psycopg2.extensions
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
 from psycopg2.extras import RealDictCursor
 from config import config
+from connection_pool import ConnectionPool
 
-# Connection pool
+# Connection pool, owned by the process that created it (see get_pool)
 _pool = None
+_pool_pid = None
+
+# Pools inherited across a fork. Closing or garbage-collecting their
+# connections would terminate sessions the parent still uses, so the child
+# keeps them referenced and never touches them.
+_inherited_pools = []
+
+# transaction() block running in the current thread/context: its cursor and
+# the callbacks to run once it commits
+_current_transaction = ContextVar('current_transaction', default=None)
+
+# Callbacks notified of every executed statement (see add_query_listener)
+_query_listeners = []
+
+# Server-side prepared statements kept per connection (least recently used are dropped)
+MAX_PREPARED_STATEMENTS = 100
+_statement_names = itertools.count(1)
+
+# Named (server-side) cursors opened by stream_query()
+_cursor_names = itertools.count(1)
+
+# SQL text -> [(column name, type oid)], described once by query_batch()
+_result_columns = {}
+
+
+class PreparedStatementConnection(psycopg2.extensions.connection):
+    """Pooled connection that remembers its server-side prepared statements."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = OrderedDict()  # SQL text -> statement name
+
+
+class Record:
+    """
+    Compact row for large result sets: a slotted dataclass per column list
+    (see record_type()) instead of one dict per row. Supports row['column']
+    like dict rows, and orjson serializes records as JSON objects directly.
+    """
+    
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key, value):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key):
+        return key in self.__dataclass_fields__
+    
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__dataclass_fields__ else default
+    
+    def keys(self):
+        return self.__dataclass_fields__.keys()
+
+
+@functools.lru_cache(maxsize=256)
+def record_type(columns, extra_fields=()):
+    """
+    Record class for a result's column names. extra_fields are filled in
+    after the query (e.g. 'tags'), default to None and serialize last.
+    """
+    fields = [*columns, *((name, object, dataclasses.field(default=None)) for name in extra_fields)]
+    return dataclasses.make_dataclass('Record', fields, bases=(Record,), slots=True)
 
 
 def get_pool():
-    """Get or create the connection pool."""
-    global _pool
+    """Get or create this process's connection pool (a fresh one after a fork)."""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid != os.getpid():
+        _inherited_pools.append(_pool)
+        _pool = None
     if _pool is None:
         db_url = config.DATABASE_URL
         if db_url:
@@ -23,38 +107,308 @@ def get_pool():
         else:
             print('DATABASE_URL environment variable is MISSING')
             
-        _pool = pool.ThreadedConnectionPool(
-            minconn=1,
-            maxconn=10,
-            dsn=db_url
+        _pool = ConnectionPool(
+            lambda: psycopg2.connect(db_url, connection_factory=PreparedStatementConnection),
+            minconn=config.DB_POOL_MIN,
+            maxconn=config.DB_POOL_MAX,
+            timeout=config.DB_POOL_TIMEOUT_SECONDS,
+            max_age=config.DB_POOL_MAX_AGE_SECONDS,
+            health_check_after=config.DB_POOL_HEALTH_CHECK_SECONDS
         )
-        print('✅ Database connection pool created')
+        _pool_pid = os.getpid()
+        print(f'✅ Database connection pool created (pid {_pool_pid})')
     return _pool
 
 
-def query(sql, params=None):
-    """Execute a query and return results."""
-    conn = None
+def close_pool():
+    """Close this process's pool, e.g. in a server's master process before forking workers."""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.closeall()
+    _pool = None
+    _pool_pid = None
+
+
+@contextmanager
+def transaction():
+    """
+    Run a block on one connection and cursor, committed once at the end.
+    
+    Every query() inside the block (including nested model calls) joins the
+    transaction; an exception rolls the whole block back. Nested transaction()
+    blocks join the outermost one.
+    
+        with transaction():
+            article_id = query('INSERT ... RETURNING id', ...)['rows'][0]['id']
+            query('INSERT INTO article_tags ...', ...)
+    """
+    current = _current_transaction.get()
+    if current is not None:
+        yield current['cursor']
+        return
+    
+    conn = get_pool().getconn()
+    token = None
     try:
-        conn = get_pool().getconn()
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(sql, params)
-            
-            # Check if this is a SELECT or RETURNING query
-            if cur.description:
-                rows = cur.fetchall()
-                conn.commit()
-                return {'rows': rows, 'rowcount': cur.rowcount}
-            else:
-                conn.commit()
-                return {'rows': [], 'rowcount': cur.rowcount}
+            current = {'cursor': cur, 'after_commit': [], 'after_rollback': []}
+            token = _current_transaction.set(current)
+            yield cur
+        conn.commit()
     except Exception as e:
-        if conn:
-            conn.rollback()
-        raise e
+        conn.rollback()
+        if isinstance(e, psycopg2.errors.FeatureNotSupported) and conn.prepared:
+            # "cached plan must not change result type": a table changed under
+            # a prepared statement; drop them all and let them be re-prepared
+            _deallocate_all(conn)
+        if current is not None:
+            for callback in current['after_rollback']:
+                callback()
+        raise
     finally:
-        if conn:
-            get_pool().putconn(conn)
+        if token is not None:
+            _current_transaction.reset(token)
+        get_pool().putconn(conn)
+    
+    for callback in current['after_commit']:
+        callback()
+
+
+def on_commit(callback):
+    """Call callback after the current transaction commits (now, if there is none)."""
+    current = _current_transaction.get()
+    if current is None:
+        callback()
+    else:
+        current['after_commit'].append(callback)
+
+
+def on_rollback(callback):
+    """Call callback if the current transaction rolls back (never, if there is none)."""
+    current = _current_transaction.get()
+    if current is not None:
+        current['after_rollback'].append(callback)
+
+
+def add_query_listener(listener):
+    """
+    Register listener(sql, params, duration_seconds), called after every
+    statement run by query() (one call per query_batch() round trip).
+    """
+    _query_listeners.append(listener)
+
+
+def notify_query_listeners(sql, params, duration):
+    """Report an executed statement to the listeners (also used by db_async)."""
+    for listener in _query_listeners:
+        listener(sql, params, duration)
+
+
+def query(sql, params=None, prepare=False, compact=False, extra_fields=()):
+    """
+    Execute a query and return results (inside the current transaction, if any).
+    
+    prepare=True runs it as a server-side prepared statement, planned once per
+    pooled connection; use it for fixed, frequently run SQL with %s placeholders.
+    
+    compact=True returns Record rows instead of dicts, for large lists;
+    extra_fields names the keys the caller adds to each row afterwards.
+    """
+    with transaction() as cur:
+        started = time.perf_counter()
+        if compact:
+            # Tuple rows on the same connection, wrapped in one record class
+            with cur.connection.cursor() as tuple_cur:
+                result = _execute(tuple_cur, sql, params, prepare)
+                if tuple_cur.description:
+                    record = record_type(tuple(column.name for column in tuple_cur.description), tuple(extra_fields))
+                    result['rows'] = list(itertools.starmap(record, result['rows']))
+        else:
+            result = _execute(cur, sql, params, prepare)
+        
+        notify_query_listeners(sql, params, time.perf_counter() - started)
+        return result
+
+
+def stream_query(sql, params=None, batch_size=500, extra_fields=(), on_batch=None):
+    """
+    Run a SELECT on a named server-side cursor and yield its rows as lists of
+    at most batch_size Records (see query(compact=True)), so memory stays flat
+    however many rows match.
+    
+    The generator holds its own pooled connection from the first iteration
+    until it is exhausted or closed; it does not join transaction() blocks.
+    on_batch(rows), if given, is applied to each batch before it is yielded,
+    with that connection as the current transaction: queries it runs (e.g.
+    loading relations) do not check out a second connection.
+    """
+    conn = get_pool().getconn()
+    started = time.perf_counter()
+    try:
+        with conn.cursor(name=f'stream_{next(_cursor_names)}') as cur, \
+                conn.cursor(cursor_factory=RealDictCursor) as batch_cur:
+            cur.itersize = batch_size
+            cur.execute(sql, params)
+            record = None
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                if record is None:
+                    record = record_type(tuple(column.name for column in cur.description), tuple(extra_fields))
+                batch = list(itertools.starmap(record, rows))
+                if on_batch is not None:
+                    token = _current_transaction.set({'cursor': batch_cur, 'after_commit': [], 'after_rollback': []})
+                    try:
+                        batch = on_batch(batch)
+                    finally:
+                        _current_transaction.reset(token)
+                yield batch
+    finally:
+        # putconn() rolls back the read-only transaction
+        get_pool().putconn(conn)
+        notify_query_listeners(sql, params, time.perf_counter() - started)
+
+
+def copy_from(sql, lines, chunk_size=64 * 1024):
+    """
+    Run COPY ... FROM STDIN (inside the current transaction, if any), feeding
+    it encoded lines from an iterable as the server reads them, so a large
+    load is never built in memory. Returns the number of rows copied.
+    """
+    with transaction() as cur:
+        started = time.perf_counter()
+        cur.copy_expert(sql, _IterableReader(lines), chunk_size)
+        notify_query_listeners(sql, None, time.perf_counter() - started)
+        return cur.rowcount
+
+
+class _IterableReader:
+    """Minimal file object over an iterable of bytes, for copy_expert()."""
+    
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+    
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def _execute(cur, sql, params, prepare):
+    statement, statement_params = _prepared(cur, sql, params) if prepare else (sql, params)
+    cur.execute(statement, statement_params)
+    
+    # Check if this is a SELECT or RETURNING query
+    if cur.description:
+        return {'rows': cur.fetchall(), 'rowcount': cur.rowcount}
+    return {'rows': [], 'rowcount': cur.rowcount}
+
+
+def query_batch(statements, prepare=False):
+    """
+    Run several independent SELECTs in one round trip and return their rows,
+    one list per statement.
+    
+    psycopg2 has no pipeline mode, so the statements are combined into a single
+    SELECT with one json_agg() column each. Values travel as their text
+    representation and are converted with the typecaster of their column
+    type, so rows come back as query() would return them.
+    
+        tags, attachments = query_batch([
+            ('SELECT * FROM tags ...', (article_id,)),
+            ('SELECT * FROM attachments ...', (article_id,))
+        ])
+    """
+    with transaction() as cur:
+        described = [_describe(cur, sql, statement_params) for sql, statement_params in statements]
+        
+        columns = []
+        params = []
+        for i, (sql, statement_params) in enumerate(statements):
+            # Columns are renamed positionally, so duplicate names are fine
+            aliases = ', '.join(f'c{j}' for j in range(len(described[i])))
+            values = ', '.join(f'c{j}::text' for j in range(len(described[i])))
+            columns.append(f"(SELECT coalesce(json_agg(ARRAY[{values}]), '[]') FROM ({sql}) q{i}({aliases})) AS r{i}")
+            params.extend(statement_params or ())
+        
+        result = query('SELECT ' + ', '.join(columns), params, prepare=prepare)
+        row = result['rows'][0]
+        return [
+            [
+                {name: None if value is None else cur.cast(oid, value) for (name, oid), value in zip(described[i], item)}
+                for item in row[f'r{i}']
+            ]
+            for i in range(len(statements))
+        ]
+
+
+def _describe(cur, sql, params):
+    """
+    Names and type oids of the columns sql returns, read once per process
+    from a LIMIT 0 run (the schema is only changed by init_database, at startup).
+    The run is not reported to query listeners, so the first request in a
+    process is not counted against its query budget for it.
+    """
+    columns = _result_columns.get(sql)
+    if columns is None:
+        cur.execute(f'SELECT * FROM ({sql}) q LIMIT 0', params)
+        columns = [(column.name, column.type_code) for column in cur.description]
+        _result_columns[sql] = columns
+    return columns
+
+
+def _prepared(cur, sql, params):
+    """Prepare sql on the cursor's connection (once) and return the EXECUTE call."""
+    conn = cur.connection
+    params = list(params or ())
+    name = conn.prepared.get(sql)
+    
+    if name is None:
+        # %s placeholders become $1..$n; %% is a literal percent sign
+        counter = itertools.count(1)
+        server_sql = re.sub(r'%(s|%)', lambda m: f'${next(counter)}' if m.group(1) == 's' else '%', sql)
+        name = f'stmt_{next(_statement_names)}'
+        cur.execute(f'PREPARE {name} AS {server_sql}')
+        conn.prepared[sql] = name
+        
+        if len(conn.prepared) > MAX_PREPARED_STATEMENTS:
+            _, oldest = conn.prepared.popitem(last=False)
+            cur.execute(f'DEALLOCATE {oldest}')
+    else:
+        conn.prepared.move_to_end(sql)
+    
+    if not params:
+        return f'EXECUTE {name}', None
+    return f"EXECUTE {name}({', '.join(['%s'] * len(params))})", params
+
+
+def _deallocate_all(conn):
+    try:
+        with conn.cursor() as cur:
+            cur.execute('DEALLOCATE ALL')
+        conn.commit()
+    except psycopg2.Error:
+        conn.rollback()
+    conn.prepared.clear()
+
+
+def pool_stats():
+    """Connection pool metrics (empty if this process has not created its pool yet)."""
+    return _pool.stats() if _pool is not None and _pool_pid == os.getpid() else {}
+
+
+def escape_like(value):
+    """Escape LIKE/ILIKE wildcards so user input matches literally."""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
 
 
 def init_database():
@@ -115,7 +469,6 @@ def init_database():
                     id SERIAL PRIMARY KEY,
                     title TEXT NOT NULL,
                     summary TEXT,
-                    content TEXT,
                     category_id INTEGER REFERENCES categories(id) ON DELETE SET NULL,
                     department_id INTEGER REFERENCES departments(id) ON DELETE SET NULL,
                     priority_id INTEGER REFERENCES priorities(id) ON DELETE SET NULL,
@@ -127,6 +480,16 @@ def init_database():
                 )
             """)
             
+            # Article bodies, kept out of the articles table so that list scans and
+            # index lookups stay small and cached; read only for single articles
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS article_bodies (
+                    article_id INTEGER PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+                    content TEXT,
+                    plain_content TEXT
+                )
+            """)
+            
             # Article-Tags junction table
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS article_tags (
@@ -185,21 +548,75 @@ def init_database():
                 )
             """)
             
+            # Move bodies out of articles tables created with a content column;
+            # run VACUUM FULL articles afterwards to return the space
+            cur.execute("""
+                DO $$
+                BEGIN
+                    IF EXISTS (
+                        SELECT 1 FROM information_schema.columns
+                        WHERE table_schema = current_schema() AND table_name = 'articles' AND column_name = 'content'
+                    ) THEN
+                        ALTER TABLE articles ADD COLUMN IF NOT EXISTS plain_content TEXT;
+                        INSERT INTO article_bodies (article_id, content, plain_content)
+                            SELECT id, content, plain_content FROM articles
+                            ON CONFLICT (article_id) DO NOTHING;
+                        ALTER TABLE articles DROP COLUMN content, DROP COLUMN plain_content;
+                    END IF;
+                END $$
+            """)
+            
+            # Full-text search vector (title A, summary B, content C), maintained by the Articles model.
+            # Rows missing a vector get a plain (non-analyzed) one here; reindex_search.py rebuilds them
+            cur.execute("ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector")
+            cur.execute("""
+                UPDATE articles a SET search_vector =
+                    setweight(to_tsvector('simple', coalesce(a.title, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(a.summary, '')), 'B') ||
+                    setweight(to_tsvector('simple', regexp_replace(coalesce(
+                        (SELECT b.content FROM article_bodies b WHERE b.article_id = a.id), ''
+                    ), '<[^>]*>', ' ', 'g')), 'C')
+                WHERE a.search_vector IS NULL
+            """)
+            
+            # Word count, reading time and excerpt derived from content on write by
+            # the Articles model (plain text goes to article_bodies);
+            # backfill_derived_fields.py fills older rows
+            cur.execute("""
+                ALTER TABLE articles
+                    ADD COLUMN IF NOT EXISTS word_count INTEGER,
+                    ADD COLUMN IF NOT EXISTS reading_minutes INTEGER,
+                    ADD COLUMN IF NOT EXISTS excerpt TEXT
+            """)
+            
             # Create indexes
             cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_category ON articles(category_id)")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_department ON articles(department_id)")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_priority ON articles(priority_id)")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_created ON articles(created_at)")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_title ON articles(title)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_updated ON articles(updated_at DESC, id DESC)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_search ON articles USING GIN(search_vector)")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_attachments_article ON attachments(article_id)")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_user_favorites_user ON user_favorites(user_id)")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_user_favorites_article ON user_favorites(article_id)")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_recently_viewed_user ON recently_viewed(user_id)")
             cur.execute("CREATE INDEX IF NOT EXISTS idx_recently_viewed_viewed_at ON recently_viewed(viewed_at)")
             
+            # Trigram indexes for typeahead (ILIKE '%x%'); skipped if pg_trgm is unavailable
+            cur.execute("SAVEPOINT trgm")
+            try:
+                cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_title_trgm ON articles USING GIN (title gin_trgm_ops)")
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_tags_name_trgm ON tags USING GIN (name gin_trgm_ops)")
+                cur.execute("RELEASE SAVEPOINT trgm")
+            except psycopg2.Error as e:
+                cur.execute("ROLLBACK TO SAVEPOINT trgm")
+                print(f'pg_trgm unavailable, typeahead will run without trigram indexes: {e}')
+            
             conn.commit()
             print('Database initialized successfully')
-            
+    
     except Exception as e:
         if conn:
             conn.rollback()
@@ -261,7 +678,7 @@ def seed_default_data():
             
             conn.commit()
             print('Default data seeded successfully')
-            
+    
     except Exception as e:
         if conn:
             conn.rollback()
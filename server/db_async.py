@@ -0,0 +1,176 @@
+"""
+Async database access for Knowledge Repository (ASGI mode)
+Native asyncio PostgreSQL pool (psycopg 3) with the same query() contract and
+%s placeholders as db.py, so async models reuse the sync models' SQL
+"""
+
+import itertools
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool
+from config import config
+from db import notify_query_listeners, record_type
+
+# Async connection pool, opened by the ASGI app on startup (see open_pool)
+_pool = None
+
+# Named (server-side) cursors opened by stream_query()
+_cursor_names = itertools.count(1)
+
+# transaction() block running in the current task: its connection and the
+# callbacks to run once it commits
+_current_transaction = ContextVar('current_async_transaction', default=None)
+
+
+async def open_pool():
+    """Create and open the async pool (once per process)."""
+    global _pool
+    if _pool is None:
+        # psycopg 3 prepares statements server-side by itself once they have
+        # run a few times on a connection, so there is no prepare= flag here
+        _pool = AsyncConnectionPool(
+            config.DATABASE_URL,
+            min_size=config.DB_ASYNC_POOL_MIN,
+            max_size=config.DB_ASYNC_POOL_MAX,
+            timeout=config.DB_POOL_TIMEOUT_SECONDS,
+            max_lifetime=config.DB_POOL_MAX_AGE_SECONDS,
+            check=AsyncConnectionPool.check_connection,
+            kwargs={'row_factory': dict_row},
+            open=False
+        )
+        await _pool.open()
+        print('✅ Async database connection pool created')
+    return _pool
+
+
+async def close_pool():
+    """Close the async pool (ASGI shutdown)."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def pool_stats():
+    """Async pool metrics (empty if the pool is not open)."""
+    return _pool.get_stats() if _pool is not None else {}
+
+
+@asynccontextmanager
+async def transaction():
+    """
+    Run a block on one connection, committed once at the end.
+    
+    Every query() awaited inside the block joins the transaction; an exception
+    rolls the whole block back. Nested transaction() blocks join the outermost one.
+    """
+    current = _current_transaction.get()
+    if current is not None:
+        yield current['connection']
+        return
+    
+    pool = await open_pool()
+    async with pool.connection() as conn:
+        current = {'connection': conn, 'after_commit': []}
+        token = _current_transaction.set(current)
+        try:
+            yield conn
+        finally:
+            _current_transaction.reset(token)
+    
+    for callback in current['after_commit']:
+        callback()
+
+
+def on_commit(callback):
+    """Call callback after the current transaction commits (now, if there is none)."""
+    current = _current_transaction.get()
+    if current is None:
+        callback()
+    else:
+        current['after_commit'].append(callback)
+
+
+async def query(sql, params=None, compact=False, extra_fields=()):
+    """
+    Execute a query and return results (inside the current transaction, if any).
+    compact=True returns db.Record rows, as in db.query().
+    """
+    async with transaction() as conn:
+        started = time.perf_counter()
+        async with conn.cursor(row_factory=tuple_row if compact else dict_row) as cur:
+            await cur.execute(sql, params)
+            rows = await cur.fetchall() if cur.description else []
+            if compact and cur.description:
+                record = record_type(tuple(column.name for column in cur.description), tuple(extra_fields))
+                rows = [record(*row) for row in rows]
+            result = {'rows': rows, 'rowcount': cur.rowcount}
+        
+        notify_query_listeners(sql, params, time.perf_counter() - started)
+        return result
+
+
+async def stream_query(sql, params=None, batch_size=500, extra_fields=(), on_batch=None):
+    """
+    Run a SELECT on a named server-side cursor and yield lists of at most
+    batch_size db.Record rows, as db.stream_query() does; on_batch is awaited
+    on each batch with the stream's connection as the current transaction.
+    """
+    pool = await open_pool()
+    started = time.perf_counter()
+    try:
+        async with pool.connection() as conn:
+            async with conn.cursor(name=f'stream_{next(_cursor_names)}', row_factory=tuple_row) as cur:
+                cur.itersize = batch_size
+                await cur.execute(sql, params)
+                record = None
+                while True:
+                    rows = await cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    if record is None:
+                        record = record_type(tuple(column.name for column in cur.description), tuple(extra_fields))
+                    batch = [record(*row) for row in rows]
+                    if on_batch is not None:
+                        token = _current_transaction.set({'connection': conn, 'after_commit': []})
+                        try:
+                            batch = await on_batch(batch)
+                        finally:
+                            _current_transaction.reset(token)
+                    yield batch
+    finally:
+        notify_query_listeners(sql, params, time.perf_counter() - started)
+
+
+async def query_batch(statements):
+    """
+    Run several independent statements in one round trip using pipeline
+    mode and return their rows, one list per statement.
+    
+        tags, attachments = await query_batch([
+            ('SELECT * FROM tags ...', (article_id,)),
+            ('SELECT * FROM attachments ...', (article_id,))
+        ])
+    """
+    async with transaction() as conn:
+        started = time.perf_counter()
+        cursors = []
+        async with conn.pipeline():
+            for sql, params in statements:
+                cur = conn.cursor()
+                await cur.execute(sql, params)
+                cursors.append(cur)
+        
+        results = []
+        for cur in cursors:
+            results.append(await cur.fetchall() if cur.description else [])
+            await cur.close()
+        
+        notify_query_listeners(
+            ';\n'.join(sql for sql, _ in statements),
+            [param for _, params in statements for param in (params or ())],
+            time.perf_counter() - started
+        )
+        return results
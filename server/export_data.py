@@ -0,0 +1,53 @@
+"""
+Export the Knowledge Repository database
+Dumps articles, tags, article-tag links, taxonomy tables and attachment
+metadata with COPY, for backups, reporting systems and offline analysis
+
+    python export_data.py                         # all tables, NDJSON, to stdout
+    python export_data.py -o backup.ndjson.gz --gzip
+    python export_data.py --format csv --tables articles -o articles.csv
+"""
+
+import argparse
+import os
+import sys
+
+# Add server directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import bulk_export
+
+
+def export_data():
+    parser = argparse.ArgumentParser(description='Export the Knowledge Repository database')
+    parser.add_argument('--format', choices=bulk_export.FORMATS, default='ndjson')
+    parser.add_argument('--tables', help=f"comma-separated subset of: {', '.join(bulk_export.TABLE_QUERIES)}")
+    parser.add_argument('--gzip', action='store_true', help='gzip-compress the output')
+    parser.add_argument('-o', '--output', default='-', help='output file (default: stdout)')
+    args = parser.parse_args()
+    
+    tables = args.tables.split(',') if args.tables else None
+    try:
+        chunks = bulk_export.stream(tables, args.format, compress=args.gzip)
+        out = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+        try:
+            total = 0
+            for chunk in chunks:
+                out.write(chunk)
+                total += len(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        if args.output != '-':
+            print(f'Exported {total} bytes to {args.output}', file=sys.stderr)
+        
+    except Exception as e:
+        print(f'Error exporting data: {e}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    export_data()
@@ -0,0 +1,36 @@
+"""
+Extract inline images from existing articles for Knowledge Repository
+Stores images embedded in article content as data: URIs as uploads and
+rewrites their src to the upload URL, as new and edited articles are saved
+"""
+
+import os
+import sys
+
+# Add server directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from config import config
+from db import init_database
+from models.articles import Articles
+
+
+def extract_inline_images():
+    print('Extracting inline images from article content...')
+    
+    try:
+        init_database()
+        os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
+        total = Articles.extract_inline_images()
+        print(f'Rewrote {total} articles.')
+        
+    except Exception as e:
+        print(f'Error extracting inline images: {e}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    extract_inline_images()
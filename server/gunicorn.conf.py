@@ -0,0 +1,82 @@
+"""
+Production server configuration for Knowledge Repository
+
+    cd server
+    gunicorn -c gunicorn.conf.py app:app
+
+The master process initializes and seeds the database once, then closes its
+connections before forking; each worker opens its own pool on first use.
+"""
+
+import os
+import shutil
+import sys
+
+# Add the server directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# gunicorn reads every module-level name as a setting, and `config` is one
+from config import Config, check_connection_budget
+
+bind = f'0.0.0.0:{Config.PORT}'
+
+# Processes for CPU-bound work (JSON, search analysis), threads for requests
+# waiting on PostgreSQL
+worker_class = 'gthread'
+workers = Config.WEB_CONCURRENCY
+threads = Config.WEB_THREADS
+
+# Fail before forking if the workers' pools could exceed the connection budget
+check_connection_budget(workers, Config.DB_POOL_MAX)
+timeout = Config.WEB_TIMEOUT_SECONDS
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth; jitter avoids
+# restarting them all at once
+max_requests = 2000
+max_requests_jitter = 200
+
+# Import the app in the master and fork workers from it (shared memory,
+# faster restarts). Nothing connects to the database at import time.
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+# Metric files from a previous run would be aggregated into this one. This
+# runs when gunicorn reads the config, before the app (and its metrics) load.
+_multiproc_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+if _multiproc_dir:
+    shutil.rmtree(_multiproc_dir, ignore_errors=True)
+    os.makedirs(_multiproc_dir, exist_ok=True)
+
+
+def on_starting(server):
+    """Runs once in the master before any worker is forked."""
+    os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+    
+    from db import init_database, seed_default_data, close_pool
+    try:
+        init_database()
+        seed_default_data()
+    except Exception as e:
+        print(f'Failed to initialize database: {e}')
+    finally:
+        # Workers must not inherit the master's connections
+        close_pool()
+
+
+def worker_exit(server, worker):
+    """Write queued article views and stop document conversions before the worker goes away."""
+    import converter
+    import view_events
+    view_events.flush()
+    converter.shutdown()
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the aggregated /metrics."""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
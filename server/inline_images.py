@@ -0,0 +1,51 @@
+"""
+Inline image extraction for Knowledge Repository
+Moves images embedded in article HTML as data: URIs into uploads and points
+their src at the stored file, so article rows carry URLs instead of base64
+"""
+
+import base64
+import binascii
+import re
+import uploads
+
+# <img ... src="data:image/...;base64,..."> with either quote style
+_IMG_DATA_SRC_RE = re.compile(
+    r'''(<img\b[^>]*?\bsrc\s*=\s*)(["'])data:(image/[\w.+-]+);base64,([A-Za-z0-9+/=\s]*)\2''',
+    re.IGNORECASE
+)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def has_inline_images(content):
+    """Cheap pre-check before extract()."""
+    return bool(content) and 'data:image/' in content
+
+
+def extract(content):
+    """
+    Store every data: URI image in content (identical images once, named by
+    their hash) and return the content with src rewritten to the upload URLs.
+    Payloads that are not valid base64 are left as they are.
+    
+    Call it inside the transaction that saves the content: new files are only
+    published if it commits (see uploads.save_content_addressed).
+    """
+    if not has_inline_images(content):
+        return content
+    
+    urls = {}  # payload -> url, for images repeated in the same content
+    
+    def store(match):
+        prefix, quote, mime_type, payload = match.groups()
+        payload = _WHITESPACE_RE.sub('', payload)
+        if payload not in urls:
+            try:
+                data = base64.b64decode(payload, validate=True)
+            except (binascii.Error, ValueError):
+                return match.group(0)
+            urls[payload] = uploads.save_content_addressed(data, mime_type.lower())
+        return f'{prefix}{quote}{urls[payload]}{quote}'
+    
+    return _IMG_DATA_SRC_RE.sub(store, content)
@@ -0,0 +1,138 @@
+"""
+Per-request instrumentation for Knowledge Repository
+Counts SQL statements and accumulates DB, serialization and handler time for
+each request, reports them in a Server-Timing header and a structured log
+line, and warns when an endpoint exceeds its query budget. Streamed responses
+run their queries after the headers are sent, so they are only logged, once
+the body has been sent, and have no query budget
+"""
+
+import json
+import logging
+import time
+from flask import g, request, current_app, has_request_context
+from flask.json.provider import JSONProvider
+from config import config
+from db import add_query_listener
+
+logger = logging.getLogger('knowledge_repo.requests')
+
+
+def query_budget(max_queries):
+    """
+    Declare how many SQL statements a view is expected to run.
+    Exceeding it logs a warning; it never fails the request.
+
+        @articles_bp.route('', methods=['GET'])
+        @query_budget(3)
+        def get_all(): ...
+    """
+    def decorator(f):
+        f.query_budget = max_queries
+        return f
+    return decorator
+
+
+class TimedJSONProvider(JSONProvider):
+    """Wraps the app's JSON provider, adding the time spent serializing responses to the request's stats."""
+
+    def __init__(self, app, provider):
+        super().__init__(app)
+        self.provider = provider
+
+    def dumps(self, obj, **kwargs):
+        return self.provider.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return self.provider.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self.provider.response(*args, **kwargs)
+        finally:
+            _add('serialize_time', time.perf_counter() - started)
+
+
+def init_app(app):
+    """Install the request hooks, the DB listener and timing of the app's JSON provider."""
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    app.json = TimedJSONProvider(app, app.json)
+    add_query_listener(_on_query)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def _add(key, value):
+    if has_request_context() and 'request_stats' in g:
+        g.request_stats[key] += value
+
+
+def _on_query(sql, params, duration):
+    _add('db_queries', 1)
+    _add('db_time', duration)
+
+
+def _start_request():
+    g.request_stats = {
+        'started': time.perf_counter(),
+        'db_queries': 0,
+        'db_time': 0.0,
+        'serialize_time': 0.0
+    }
+
+
+def _finish_request(response):
+    stats = g.get('request_stats')
+    if stats is None:
+        return response
+
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, 'query_budget', None) or config.QUERY_BUDGET or None
+    entry = {
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code
+    }
+
+    if response.is_streamed:
+        # The body (and the queries behind it) is produced after this hook;
+        # the listener keeps adding to stats while it streams. Its query count
+        # grows with the number of rows, so no budget applies
+        response.call_on_close(lambda: _log_request(entry, stats, None))
+        return response
+
+    total = time.perf_counter() - stats['started']
+    response.headers['Server-Timing'] = ', '.join([
+        f'db;dur={stats["db_time"] * 1000:.1f};desc="{stats["db_queries"]} queries"',
+        f'serialize;dur={stats["serialize_time"] * 1000:.1f}',
+        f'total;dur={total * 1000:.1f}'
+    ])
+    _log_request(entry, stats, budget)
+    return response
+
+
+def _log_request(entry, stats, budget):
+    total = time.perf_counter() - stats['started']
+    over_budget = budget is not None and stats['db_queries'] > budget
+
+    if config.REQUEST_LOG or over_budget:
+        line = json.dumps({
+            **entry,
+            'db_queries': stats['db_queries'],
+            'db_ms': round(stats['db_time'] * 1000, 2),
+            'serialize_ms': round(stats['serialize_time'] * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'query_budget': budget
+        })
+        if over_budget:
+            logger.warning(f'Query budget exceeded: {line}')
+        else:
+            logger.info(line)
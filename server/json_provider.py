@@ -0,0 +1,94 @@
+"""
+Fast JSON provider for Knowledge Repository
+orjson-backed replacement for Flask's default JSON provider. Serializes
+database rows (RealDictRow and other dict subclasses), datetime, date, UUID
+and dataclasses natively; Decimal and memoryview/bytes through default().
+"""
+
+import base64
+import decimal
+from flask.json.provider import JSONProvider, DefaultJSONProvider
+from config import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Naive timestamps are stored as UTC: "2024-01-15T10:00:00Z", as the
+    # Node.js server sent them
+    OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value):
+    """Types orjson has no native encoding for."""
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (memoryview, bytes, bytearray)):
+        return base64.b64encode(value).decode('ascii')
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(JSONProvider):
+    """JSON provider backed by orjson; responses are built from bytes directly."""
+    
+    mimetype = 'application/json'
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=OPTIONS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=OPTIONS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def create_provider(app):
+    """The JSON provider selected by JSON_PROVIDER ('fast' unless orjson is missing)."""
+    if config.JSON_PROVIDER == 'fast':
+        if orjson is not None:
+            return FastJSONProvider(app)
+        print('orjson is not installed, using the default JSON provider')
+    return DefaultJSONProvider(app)
+
+
+def stream_json_array(batches, dumps):
+    """Encode batches of rows as a single JSON array, one chunk per batch."""
+    yield '['
+    first = True
+    for batch in batches:
+        if batch:
+            chunk = ','.join(dumps(row) for row in batch)
+            yield chunk if first else ',' + chunk
+            first = False
+    yield ']'
+
+
+def stream_ndjson(batches, dumps):
+    """Encode batches of rows as newline-delimited JSON, one chunk per batch."""
+    for batch in batches:
+        yield ''.join(dumps(row) + '\n' for row in batch)
+
+
+async def astream_json_array(batches, dumps):
+    """stream_json_array() for async generators of batches."""
+    yield '['
+    first = True
+    async for batch in batches:
+        if batch:
+            chunk = ','.join(dumps(row) for row in batch)
+            yield chunk if first else ',' + chunk
+            first = False
+    yield ']'
+
+
+async def astream_ndjson(batches, dumps):
+    """stream_ndjson() for async generators of batches."""
+    async for batch in batches:
+        yield ''.join(dumps(row) + '\n' for row in batch)
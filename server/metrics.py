@@ -0,0 +1,186 @@
+"""
+Prometheus metrics for Knowledge Repository
+Request latency and status counts per blueprint/endpoint, in-flight requests,
+connection pool, cache and upload metrics, served to admins at /metrics
+
+With several worker processes, set PROMETHEUS_MULTIPROC_DIR to an empty
+directory shared by the workers; /metrics then aggregates all of them.
+"""
+
+import os
+import threading
+import time
+from flask import g, request, Response
+from prometheus_client import (
+    REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, CONTENT_TYPE_LATEST,
+    generate_latest, multiprocess
+)
+import cache
+from auth import admin_required
+from config import config
+from db import pool_stats
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by blueprint and endpoint',
+    ['blueprint', 'endpoint', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+REQUESTS = Counter(
+    'http_requests_total',
+    'Requests by blueprint, endpoint and status code',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'Requests currently being handled',
+    multiprocess_mode='livesum'
+)
+
+POOL_CONNECTIONS = Gauge(
+    'db_pool_connections',
+    'Database connections by state',
+    ['state'],
+    multiprocess_mode='livesum'
+)
+POOL_CONNECTION_AGE = Gauge(
+    'db_pool_connection_age_max_seconds',
+    'Age of the oldest pooled connection',
+    multiprocess_mode='livemax'
+)
+POOL_EVENTS = Counter(
+    'db_pool_events_total',
+    'Connection pool checkouts, exhaustion events, timeouts and recycled connections',
+    ['event']
+)
+POOL_WAIT = Counter(
+    'db_pool_checkout_wait_seconds_total',
+    'Total time spent waiting to check out a connection'
+)
+
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Taxonomy cache lookups by result (hit or miss)',
+    ['cache', 'result']
+)
+
+UPLOAD_BYTES = Counter(
+    'upload_bytes_total',
+    'Bytes received through uploads',
+    ['kind']
+)
+
+_POOL_EVENT_KEYS = {
+    'checkout': 'checkouts',
+    'exhausted': 'exhausted',
+    'timeout': 'timeouts',
+    'recycled': 'connections_recycled',
+    'health_check_failure': 'health_check_failures'
+}
+
+# Last exported totals, to turn cumulative stats into counter increments
+_exported = {}
+_exported_lock = threading.Lock()
+
+# Process running the refresher thread (see _ensure_refresher)
+_refresher_pid = None
+_refresher_lock = threading.Lock()
+
+
+def init_app(app):
+    """Install request hooks and the /metrics endpoint (admin only)."""
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_end_request)
+    app.add_url_rule('/metrics', 'metrics', admin_required(_metrics_endpoint))
+
+
+def record_upload(kind, size):
+    """Count bytes received by an upload endpoint ('attachment', 'image', ...)."""
+    UPLOAD_BYTES.labels(kind=kind).inc(size or 0)
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    IN_FLIGHT.inc()
+    _ensure_refresher()
+
+
+def _finish_request(response):
+    started = g.get('metrics_started')
+    if started is None or request.endpoint == 'metrics':
+        return response
+
+    # Unmatched URLs share one label so 404 scans can't explode cardinality
+    labels = {
+        'blueprint': request.blueprint or 'app',
+        'endpoint': request.endpoint or 'unmatched',
+        'method': request.method
+    }
+    REQUEST_LATENCY.labels(**labels).observe(time.perf_counter() - started)
+    REQUESTS.labels(status=str(response.status_code), **labels).inc()
+    _export_process_stats()
+    return response
+
+
+def _end_request(exc=None):
+    if g.pop('metrics_started', None) is not None:
+        IN_FLIGHT.dec()
+
+
+def _export_process_stats():
+    """Copy this process's pool and cache statistics into the metrics."""
+    stats = pool_stats()
+    if stats:
+        POOL_CONNECTIONS.labels(state='in_use').set(stats['in_use'])
+        POOL_CONNECTIONS.labels(state='idle').set(stats['idle'])
+        POOL_CONNECTIONS.labels(state='waiting').set(stats['waiting'])
+        POOL_CONNECTION_AGE.set(stats['connection_age_seconds_max'])
+        for event, key in _POOL_EVENT_KEYS.items():
+            _inc_to(('pool', event), POOL_EVENTS.labels(event=event), stats[key])
+        _inc_to(('pool', 'wait'), POOL_WAIT, stats['wait_seconds_total'])
+
+    for name, counts in cache.stats().items():
+        _inc_to(('cache', name, 'hit'), CACHE_REQUESTS.labels(cache=name, result='hit'), counts['hits'])
+        _inc_to(('cache', name, 'miss'), CACHE_REQUESTS.labels(cache=name, result='miss'), counts['misses'])
+
+
+def _ensure_refresher():
+    """
+    With PROMETHEUS_MULTIPROC_DIR, /metrics reads the other workers' metric
+    files without running any code in them, so each worker refreshes its own
+    pool and cache metrics on a timer; an idle worker's gauges stay current.
+    Started once per process (again after a fork), as view_events' flusher.
+    """
+    global _refresher_pid
+    if _refresher_pid == os.getpid() or not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        return
+    with _refresher_lock:
+        if _refresher_pid != os.getpid():
+            threading.Thread(target=_run_refresher, name='metrics-refresher', daemon=True).start()
+            _refresher_pid = os.getpid()
+
+
+def _run_refresher():
+    while True:
+        time.sleep(config.METRICS_REFRESH_SECONDS)
+        _export_process_stats()
+
+
+def _inc_to(key, counter, total):
+    with _exported_lock:
+        previous = _exported.get(key, 0)
+        if total > previous:
+            counter.inc(total - previous)
+            _exported[key] = total
+
+
+def _metrics_endpoint():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        # Single process: refresh at scrape time
+        registry = REGISTRY
+        _export_process_stats()
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
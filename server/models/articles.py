@@ -3,20 +3,152 @@ Articles model for Knowledge Repository
 """
 
 import re
-from db import query
+import html
+import json
+from datetime import datetime
+import analyzer
+import inline_images
+from auth import base64url_encode, base64url_decode
+from db import query, query_batch, stream_query, transaction, escape_like
 from models.tags import Tags
 from models.attachments import Attachments
 
+# Tags that separate words when HTML is flattened to text; others are removed
+_BLOCK_TAG_RE = re.compile(
+    r'<(?:br|hr|p|div|li|ul|ol|h[1-6]|table|tr|td|th|blockquote|pre)\b[^>]*>'
+    r'|</(?:p|div|li|ul|ol|h[1-6]|table|tr|td|th|blockquote|pre)>',
+    re.IGNORECASE
+)
+_TAG_RE = re.compile(r'<[^>]*>')
+
 
 class Articles:
+    # Columns of the articles table that list views may project
+    COLUMNS = (
+        'id', 'title', 'summary', 'excerpt', 'word_count', 'reading_minutes',
+        'category_id', 'department_id', 'priority_id', 'author', 'author_id', 'views',
+        'created_at', 'updated_at'
+    )
+    
+    # Columns of article_bodies: the heavy HTML lives outside the articles table
+    # and is joined only for detail/edit views, exports and explicit fields=content
+    BODY_COLUMNS = ('content',)
+    
+    BODY_JOIN_SQL = 'LEFT JOIN article_bodies b ON b.article_id = a.id'
+    
+    # Computed from content on write (see _derived_fields)
+    DERIVED_COLUMNS = ('excerpt', 'word_count', 'reading_minutes')
+    
+    MAX_PAGE_SIZE = 200
+    
+    EXCERPT_LENGTH = 200
+    WORDS_PER_MINUTE = 200
+    
+    # Weighted search document; parameters come from _search_document()
+    SEARCH_VECTOR_SQL = """
+        setweight(to_tsvector('simple', %s), 'A') ||
+        setweight(to_tsvector('simple', %s), 'B') ||
+        setweight(to_tsvector('simple', %s), 'C')
+    """
+    
+    # Article content as plain text, for database-side highlighting; stored on
+    # write, stripped here only for rows not yet backfilled (backfill_derived_fields.py)
+    PLAIN_CONTENT_SQL = "coalesce(b.plain_content, regexp_replace(coalesce(b.content, ''), '<[^>]*>', ' ', 'g'))"
+    
+    HEADLINE_OPTIONS = 'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15'
+    
+    # Snippets are HTML (with <mark> tags), so their text is escaped first;
+    # plain_content is unescaped text and may contain "<script>" literally
+    ESCAPE_HTML_SQL = "replace(replace(replace({}, '&', '&amp;'), '<', '&lt;'), '>', '&gt;')"
+    
+    SUGGEST_SQL = """
+        SELECT id, title FROM articles
+        WHERE title ILIKE %s
+        ORDER BY title ILIKE %s DESC, updated_at DESC
+        LIMIT %s
+    """
+    
+    @staticmethod
+    def get_all(filters=None, fields=None):
+        sql, params = Articles._build_list_query(filters, fields)
+        sql += " ORDER BY a.updated_at DESC, a.id DESC"
+        
+        # Compact rows: lists can be thousands of articles
+        result = query(sql, params if params else None, compact=True, extra_fields=('tags', 'attachments'))
+        articles = result['rows']
+        
+        # Get tags and attachments for all articles in one batch
+        Articles._load_relations(articles)
+        
+        return articles
+    
+    @staticmethod
+    def get_page(filters=None, limit=50, cursor=None, fields=None):
+        """
+        Get one page of articles using keyset pagination on (updated_at, id).
+        Returns the articles and an opaque cursor for the next page (or None).
+        """
+        sql, params, limit = Articles._page_query(filters, limit, cursor, fields)
+        result = query(sql, params, compact=True, extra_fields=('tags', 'attachments'))
+        page = Articles._page_result(result['rows'], limit)
+        Articles._load_relations(page['articles'])
+        return page
+    
     @staticmethod
-    def get_all(filters=None):
+    def stream(filters=None, fields=None, batch_size=500, body=False):
+        """
+        Articles as get_all() returns them, as a generator of batches read from
+        a server-side cursor, with tags and attachments loaded per batch;
+        body=True adds the content (exports). Invalid fields raise ValueError
+        here, before anything is read.
+        """
+        sql, params = Articles._stream_query(filters, fields, body)
+        # Relations are loaded on the stream's own connection
+        return stream_query(
+            sql, params, batch_size, extra_fields=('tags', 'attachments'), on_batch=Articles._load_relations
+        )
+    
+    @staticmethod
+    def _stream_query(filters=None, fields=None, body=False):
+        sql, params = Articles._build_list_query(filters, fields, body)
+        return sql + " ORDER BY a.updated_at DESC, a.id DESC", params or None
+    
+    @staticmethod
+    def _page_query(filters=None, limit=50, cursor=None, fields=None):
+        """Build the keyset page query; returns (sql, params, clamped limit)."""
+        limit = max(1, min(int(limit), Articles.MAX_PAGE_SIZE))
+        sql, params = Articles._build_list_query(filters, fields)
+        
+        if cursor:
+            updated_at, last_id = Articles._decode_cursor(cursor)
+            sql += " AND (a.updated_at, a.id) < (%s, %s)"
+            params.extend([updated_at, last_id])
+        
+        # Fetch one extra row to know whether another page exists
+        sql += " ORDER BY a.updated_at DESC, a.id DESC LIMIT %s"
+        params.append(limit + 1)
+        return sql, params, limit
+    
+    @staticmethod
+    def _page_result(rows, limit):
+        """Split the limit + 1 rows of a page query into the page and its next cursor."""
+        articles = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit and articles:
+            last = articles[-1]
+            next_cursor = Articles._encode_cursor(last['updated_at'], last['id'])
+        return {'articles': articles, 'nextCursor': next_cursor}
+    
+    @staticmethod
+    def _build_list_query(filters=None, fields=None, body=False):
+        """Build the filtered article list query for the requested projection."""
         if filters is None:
             filters = {}
         
-        sql = """
+        body = Articles._wants_body(fields, body)
+        sql = f"""
             SELECT 
-                a.*,
+                {Articles._select_columns(fields, body)},
                 c.name as category_name,
                 d.name as department_name,
                 p.name as priority_name,
@@ -26,6 +158,7 @@ class Articles:
             LEFT JOIN categories c ON a.category_id = c.id
             LEFT JOIN departments d ON a.department_id = d.id
             LEFT JOIN priorities p ON a.priority_id = p.id
+            {Articles.BODY_JOIN_SQL if body else ''}
             WHERE 1=1
         """
         params = []
@@ -42,23 +175,78 @@ class Articles:
             sql += " AND a.priority_id = %s"
             params.append(filters['priority_id'])
         
-        sql += " ORDER BY a.updated_at DESC"
-        
-        result = query(sql, params if params else None)
-        articles = result['rows']
+        return sql, params
+    
+    @staticmethod
+    def _select_columns(fields=None, body=False):
+        """
+        Resolve a projection into a column list.
+        Accepts None (the articles columns, and the body columns if body),
+        'summary' (the articles columns) or a comma-separated list of column
+        names. Body columns need BODY_JOIN_SQL (see _wants_body).
+        """
+        if not fields or fields == 'summary':
+            columns = [f'a.{c}' for c in Articles.COLUMNS]
+            if body and not fields:
+                columns += [f'b.{c}' for c in Articles.BODY_COLUMNS]
+        else:
+            requested = {f.strip() for f in fields.split(',')}
+            unknown = requested - set(Articles.COLUMNS) - set(Articles.BODY_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+            # id and updated_at are always needed for relations and cursors
+            requested |= {'id', 'updated_at'}
+            columns = [f'a.{c}' for c in Articles.COLUMNS if c in requested]
+            columns += [f'b.{c}' for c in Articles.BODY_COLUMNS if c in requested]
+        
+        return ', '.join(columns)
+    
+    @staticmethod
+    def _wants_body(fields=None, body=False):
+        """Whether a projection selects body columns, and so joins article_bodies."""
+        if not fields:
+            return body
+        if fields == 'summary':
+            return False
+        return any(f.strip() in Articles.BODY_COLUMNS for f in fields.split(','))
+    
+    @staticmethod
+    def _encode_cursor(updated_at, id):
+        payload = json.dumps([updated_at.isoformat(), id], separators=(',', ':'))
+        return base64url_encode(payload.encode())
+    
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            updated_at, id = json.loads(base64url_decode(cursor))
+            return datetime.fromisoformat(updated_at), int(id)
+        except Exception:
+            raise ValueError('Invalid cursor')
+    
+    @staticmethod
+    def get_by_id(id):
+        # Article, tags and attachments in one round trip
+        articles, tags, attachments = query_batch([
+            (Articles._detail_sql(), (id,)),
+            (Tags.BY_ARTICLE_SQL, (id,)),
+            (Attachments.BY_ARTICLE_SQL, (id,))
+        ], prepare=True)
+        
+        if not articles:
+            return None
         
-        # Get tags and attachments for each article
-        for article in articles:
-            article['tags'] = Tags.get_by_article_id(article['id'])
-            article['attachments'] = Attachments.get_by_article_id(article['id'])
+        article = articles[0]
+        article['tags'] = tags
+        article['attachments'] = attachments
         
-        return articles
+        return article
     
     @staticmethod
-    def get_by_id(id):
-        result = query("""
+    def _detail_sql():
+        """Single article with its body and taxonomy names, by a.id = %s."""
+        return f"""
             SELECT 
-                a.*,
+                {Articles._select_columns(body=True)},
                 c.name as category_name,
                 d.name as department_name,
                 p.name as priority_name,
@@ -68,86 +256,123 @@ class Articles:
             LEFT JOIN categories c ON a.category_id = c.id
             LEFT JOIN departments d ON a.department_id = d.id
             LEFT JOIN priorities p ON a.priority_id = p.id
+            {Articles.BODY_JOIN_SQL}
             WHERE a.id = %s
-        """, (id,))
-        
-        if not result['rows']:
-            return None
-        
-        article = result['rows'][0]
-        article['tags'] = Tags.get_by_article_id(id)
-        article['attachments'] = Attachments.get_by_article_id(id)
-        
-        return article
+        """
     
     @staticmethod
     def create(data):
-        result = query("""
-            INSERT INTO articles (title, summary, content, category_id, department_id, priority_id, author, author_id)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id
-        """, (
-            data.get('title'),
-            data.get('summary'),
-            data.get('content'),
-            data.get('category_id'),
-            data.get('department_id'),
-            data.get('priority_id'),
-            data.get('author'),
-            data.get('author_id')
-        ))
-        
-        article_id = result['rows'][0]['id']
-        
-        # Add tags
-        tags = data.get('tags', [])
-        if tags:
-            Articles.set_tags(article_id, tags, data.get('author_id'))
-        
-        # Link attachments
-        attachment_ids = data.get('attachmentIds', [])
-        if attachment_ids:
-            Attachments.assign_to_article(article_id, attachment_ids)
-        
-        return Articles.get_by_id(article_id)
+        # One connection and one commit for the insert, tags, attachments and re-read
+        with transaction():
+            # Pasted images are stored as uploads (kept only if this commits);
+            # the row keeps their URLs
+            content = inline_images.extract(data.get('content'))
+            plain_content, word_count, reading_minutes, excerpt = Articles._derived_fields(content)
+            
+            # The article and its body in one statement
+            result = query(f"""
+                WITH article AS (
+                    INSERT INTO articles (
+                        title, summary, word_count, reading_minutes, excerpt,
+                        category_id, department_id, priority_id, author, author_id, search_vector
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, {Articles.SEARCH_VECTOR_SQL})
+                    RETURNING id
+                ), body AS (
+                    INSERT INTO article_bodies (article_id, content, plain_content)
+                    SELECT id, %s, %s FROM article
+                )
+                SELECT id FROM article
+            """, (
+                data.get('title'),
+                data.get('summary'),
+                word_count,
+                reading_minutes,
+                excerpt,
+                data.get('category_id'),
+                data.get('department_id'),
+                data.get('priority_id'),
+                data.get('author'),
+                data.get('author_id'),
+                *Articles._search_document(data.get('title'), data.get('summary'), plain_content),
+                content,
+                plain_content
+            ))
+            
+            article_id = result['rows'][0]['id']
+            
+            # Add tags
+            tags = data.get('tags', [])
+            if tags:
+                Articles.set_tags(article_id, tags, data.get('author_id'))
+            
+            # Link attachments
+            attachment_ids = data.get('attachmentIds', [])
+            if attachment_ids:
+                Attachments.assign_to_article(article_id, attachment_ids)
+            
+            return Articles.get_by_id(article_id)
     
     @staticmethod
     def update(id, data):
-        query("""
-            UPDATE articles SET
-                title = %s,
-                summary = %s,
-                content = %s,
-                category_id = %s,
-                department_id = %s,
-                priority_id = %s,
-                author = %s,
-                author_id = %s,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-        """, (
-            data.get('title'),
-            data.get('summary'),
-            data.get('content'),
-            data.get('category_id'),
-            data.get('department_id'),
-            data.get('priority_id'),
-            data.get('author'),
-            data.get('author_id'),
-            id
-        ))
-        
-        # Update tags
-        tags = data.get('tags', [])
-        if tags is not None:
-            Articles.set_tags(id, tags, data.get('author_id'))
-        
-        # Update attachments
-        attachment_ids = data.get('attachmentIds', [])
-        if attachment_ids is not None:
-            Attachments.assign_to_article(id, attachment_ids)
-        
-        return Articles.get_by_id(id)
+        # One connection and one commit for the update, tags, attachments and re-read
+        with transaction():
+            # Pasted images are stored as uploads (kept only if this commits);
+            # the row keeps their URLs
+            content = inline_images.extract(data.get('content'))
+            plain_content, word_count, reading_minutes, excerpt = Articles._derived_fields(content)
+            
+            # The article and its body in one statement
+            query(f"""
+                WITH body AS (
+                    INSERT INTO article_bodies (article_id, content, plain_content)
+                    SELECT id, %s, %s FROM articles WHERE id = %s
+                    ON CONFLICT (article_id) DO UPDATE
+                    SET content = EXCLUDED.content, plain_content = EXCLUDED.plain_content
+                )
+                UPDATE articles SET
+                    title = %s,
+                    summary = %s,
+                    word_count = %s,
+                    reading_minutes = %s,
+                    excerpt = %s,
+                    category_id = %s,
+                    department_id = %s,
+                    priority_id = %s,
+                    author = %s,
+                    author_id = %s,
+                    search_vector = {Articles.SEARCH_VECTOR_SQL},
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s
+            """, (
+                content,
+                plain_content,
+                id,
+                data.get('title'),
+                data.get('summary'),
+                word_count,
+                reading_minutes,
+                excerpt,
+                data.get('category_id'),
+                data.get('department_id'),
+                data.get('priority_id'),
+                data.get('author'),
+                data.get('author_id'),
+                *Articles._search_document(data.get('title'), data.get('summary'), plain_content),
+                id
+            ))
+            
+            # Update tags
+            tags = data.get('tags', [])
+            if tags is not None:
+                Articles.set_tags(id, tags, data.get('author_id'))
+            
+            # Update attachments
+            attachment_ids = data.get('attachmentIds', [])
+            if attachment_ids is not None:
+                Attachments.assign_to_article(id, attachment_ids)
+            
+            return Articles.get_by_id(id)
     
     @staticmethod
     def delete(id):
@@ -156,107 +381,308 @@ class Articles:
     
     @staticmethod
     def set_tags(article_id, tag_names, author_id=None):
-        # Remove existing tags
-        query('DELETE FROM article_tags WHERE article_id = %s', (article_id,))
+        """Sync an article's tags: create missing tags, then add/remove only changed links."""
+        tag_names = [name.strip() for name in tag_names if name and name.strip()]
         
-        # Add new tags
-        for tag_name in tag_names:
-            tag = Tags.create(tag_name, author_id)
+        with transaction():
+            tag_ids = [tag['id'] for tag in Tags.get_or_create_many(tag_names, author_id)]
+            
+            # Remove links that are no longer wanted
             query(
-                'INSERT INTO article_tags (article_id, tag_id) VALUES (%s, %s) ON CONFLICT DO NOTHING',
-                (article_id, tag['id'])
+                'DELETE FROM article_tags WHERE article_id = %s AND NOT (tag_id = ANY(%s))',
+                (article_id, tag_ids)
             )
+            
+            # Add new links; existing ones are left untouched
+            query("""
+                INSERT INTO article_tags (article_id, tag_id)
+                SELECT %s, tag_id FROM unnest(%s::int[]) AS tag_id
+                ON CONFLICT DO NOTHING
+            """, (article_id, tag_ids))
     
     @staticmethod
-    def increment_views(id):
-        query('UPDATE articles SET views = views + 1 WHERE id = %s', (id,))
+    def add_views(deltas):
+        """Apply aggregated view counts ({article_id: delta}) in one statement."""
+        if not deltas:
+            return
+        
+        article_ids = sorted(deltas)
+        with transaction():
+            # Lock the rows in id order first: the UPDATE locks them in whatever
+            # order its plan visits them, so concurrent flushes could deadlock
+            query(
+                'SELECT id FROM articles WHERE id = ANY(%s) ORDER BY id FOR UPDATE',
+                (article_ids,)
+            )
+            query("""
+                UPDATE articles a SET views = a.views + v.delta
+                FROM unnest(%s::int[], %s::int[]) AS v(id, delta)
+                WHERE a.id = v.id
+            """, (article_ids, [deltas[id] for id in article_ids]))
+    
+    @staticmethod
+    def exists(id):
+        result = query('SELECT 1 FROM articles WHERE id = %s', (id,))
+        return len(result['rows']) > 0
+    
+    @staticmethod
+    def search(search_term, limit=50, offset=0):
+        """
+        Ranked full-text search over title (A), summary (B) and content (C).
+        Highlights are generated by the database for the returned page only.
+        """
+        search_query = Articles._search_query(search_term, limit, offset)
+        if search_query is None:
+            return []
+        
+        articles = query(*search_query, compact=True, extra_fields=('tags',))['rows']
+        
+        # Enrich with tags
+        Articles._load_relations(articles, attachments=False)
+        
+        return articles
     
     @staticmethod
-    def search(search_term):
-        result = query("""
+    def _search_query(search_term, limit=50, offset=0):
+        """
+        Build the ranked search query as (sql, params), or None if the term has
+        no words. Articles matching the words as typed come first, then those
+        found only through prefix-stripped stems (see analyzer.to_exact_ts_query).
+        """
+        ts_query = analyzer.to_ts_query(search_term)
+        if not ts_query:
+            return None
+        
+        limit = max(1, min(int(limit), Articles.MAX_PAGE_SIZE))
+        offset = max(0, int(offset))
+        
+        sql = f"""
+            WITH q AS (
+                SELECT
+                    to_tsquery('simple', %s) AS query,
+                    to_tsquery('simple', %s) AS exact,
+                    to_tsquery('simple', %s) AS highlight
+            ),
+            hits AS (
+                SELECT a.id, a.search_vector @@ q.exact AS exact, ts_rank_cd(a.search_vector, q.query) AS rank
+                FROM articles a, q
+                WHERE a.search_vector @@ q.query
+                ORDER BY exact DESC, rank DESC, a.updated_at DESC, a.id DESC
+                LIMIT %s OFFSET %s
+            )
             SELECT 
-                a.*,
+                {Articles._select_columns()},
                 c.name as category_name,
                 d.name as department_name,
                 p.name as priority_name,
                 p.color as priority_color,
-                p.level as priority_level
-            FROM articles a
+                p.level as priority_level,
+                hits.rank,
+                CASE
+                    WHEN ts_filter(a.search_vector, '{{a}}') @@ q.query THEN 'title'
+                    WHEN ts_filter(a.search_vector, '{{b}}') @@ q.query THEN 'summary'
+                    ELSE 'content'
+                END AS "matchField",
+                CASE
+                    WHEN ts_filter(a.search_vector, '{{a}}') @@ q.query
+                        THEN {Articles.ESCAPE_HTML_SQL.format('a.title')}
+                    WHEN ts_filter(a.search_vector, '{{b}}') @@ q.query
+                        THEN ts_headline('simple', {Articles.ESCAPE_HTML_SQL.format('a.summary')}, q.highlight, %s)
+                    ELSE ts_headline('simple', {Articles.ESCAPE_HTML_SQL.format(Articles.PLAIN_CONTENT_SQL)}, q.highlight, %s)
+                END AS snippet
+            FROM hits
+            JOIN articles a ON a.id = hits.id
             LEFT JOIN categories c ON a.category_id = c.id
             LEFT JOIN departments d ON a.department_id = d.id
             LEFT JOIN priorities p ON a.priority_id = p.id
-            WHERE 
-                a.title ILIKE %s OR 
-                a.summary ILIKE %s OR 
-                a.content ILIKE %s
-            ORDER BY a.updated_at DESC
-        """, (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%'))
-        
-        articles = result['rows']
-        
-        # Enrich with tags and snippets
-        for article in articles:
-            article['tags'] = Tags.get_by_article_id(article['id'])
-            article['snippet'] = Articles._generate_snippet(article, search_term)
-            article['matchField'] = Articles._get_match_field(article, search_term)
-        
-        return articles
+            {Articles.BODY_JOIN_SQL}
+            CROSS JOIN q
+            ORDER BY hits.exact DESC, hits.rank DESC, a.updated_at DESC, a.id DESC
+        """
+        return sql, (
+            ts_query, analyzer.to_exact_ts_query(search_term), analyzer.to_highlight_query(search_term), limit, offset,
+            Articles.HEADLINE_OPTIONS, Articles.HEADLINE_OPTIONS
+        )
     
     @staticmethod
-    def _generate_snippet(article, search_term):
-        """Generate a snippet showing content around the search match."""
-        snippet_length = 150
-        term = search_term.lower()
-        
-        # Check title first
-        if article.get('title') and term in article['title'].lower():
-            return article['title']
-        
-        # Then summary
-        if article.get('summary') and term in article['summary'].lower():
-            return Articles._extract_snippet(article['summary'], search_term, snippet_length)
+    def suggest(term, limit=8):
+        """Lightweight (id, title) matches for typeahead, prefix matches first."""
+        pattern = escape_like(term)
+        result = query(Articles.SUGGEST_SQL, (f'%{pattern}%', f'{pattern}%', limit))
+        return result['rows']
+    
+    @staticmethod
+    def _search_document(title, summary, plain_content):
+        """
+        Analyzed text for the weighted search_vector: title, summary and
+        plain-text content, run through the Hebrew-aware analyzer.
+        """
+        return (
+            analyzer.to_index_text(title),
+            analyzer.to_index_text(summary),
+            analyzer.to_index_text(plain_content)
+        )
+    
+    @staticmethod
+    def _plain_text(content):
+        """HTML content as plain text: tags removed, entities decoded, whitespace collapsed."""
+        text = _TAG_RE.sub('', _BLOCK_TAG_RE.sub(' ', content or ''))
+        return ' '.join(html.unescape(text).split())
+    
+    @staticmethod
+    def _derived_fields(content):
+        """
+        (plain_content, word_count, reading_minutes, excerpt) for HTML content,
+        stored on write so searches and list cards never re-parse the HTML.
+        """
+        plain_content = Articles._plain_text(content)
+        word_count = len(plain_content.split())
+        reading_minutes = -(-word_count // Articles.WORDS_PER_MINUTE)
         
-        # Finally content (strip HTML first)
-        if article.get('content'):
-            text_content = re.sub(r'<[^>]*>', ' ', article['content'])
-            text_content = re.sub(r'\s+', ' ', text_content)
-            if term in text_content.lower():
-                return Articles._extract_snippet(text_content, search_term, snippet_length)
+        excerpt = plain_content
+        if len(excerpt) > Articles.EXCERPT_LENGTH:
+            excerpt = excerpt[:Articles.EXCERPT_LENGTH].rsplit(' ', 1)[0] + '…'
         
-        return article.get('summary', '')
+        return plain_content, word_count, reading_minutes, excerpt
     
     @staticmethod
-    def _extract_snippet(text, search_term, length):
-        """Extract a snippet around the match."""
-        lower_text = text.lower()
-        lower_term = search_term.lower()
-        index = lower_text.find(lower_term)
-        
-        if index == -1:
-            return text[:length * 2]
+    def backfill_derived_fields(batch_size=500, all_rows=False):
+        """
+        Compute the derived fields (see _derived_fields) of existing articles,
+        in id order and batches; only rows never computed unless all_rows.
+        Returns the number of articles updated; updated_at is left unchanged.
+        """
+        last_id = 0
+        total = 0
+        while True:
+            result = query(f"""
+                SELECT a.id, a.updated_at, b.content FROM articles a
+                {Articles.BODY_JOIN_SQL}
+                WHERE a.id > %s {'' if all_rows else 'AND b.plain_content IS NULL'}
+                ORDER BY a.id LIMIT %s
+            """, (last_id, batch_size))
+            rows = result['rows']
+            if not rows:
+                return total
+            
+            # One set-based statement per batch, for both tables. Only rows not
+            # edited since they were read are written: FOR UPDATE re-checks
+            # updated_at on the latest version and holds off concurrent edits
+            values = [Articles._derived_fields(row['content']) for row in rows]
+            result = query("""
+                WITH v AS (
+                    SELECT * FROM unnest(%s::int[], %s::timestamp[], %s::text[], %s::int[], %s::int[], %s::text[])
+                        AS v(id, updated_at, plain_content, word_count, reading_minutes, excerpt)
+                ), unchanged AS (
+                    SELECT v.* FROM v
+                    JOIN articles a ON a.id = v.id AND a.updated_at = v.updated_at
+                    FOR UPDATE OF a
+                ), body AS (
+                    INSERT INTO article_bodies (article_id, plain_content)
+                    SELECT id, plain_content FROM unchanged
+                    ON CONFLICT (article_id) DO UPDATE SET plain_content = EXCLUDED.plain_content
+                )
+                UPDATE articles a SET
+                    word_count = v.word_count,
+                    reading_minutes = v.reading_minutes,
+                    excerpt = v.excerpt
+                FROM unchanged v
+                WHERE a.id = v.id
+            """, (
+                [row['id'] for row in rows],
+                [row['updated_at'] for row in rows],
+                *(list(column) for column in zip(*values))
+            ))
+            
+            last_id = rows[-1]['id']
+            total += result['rowcount']
+    
+    @staticmethod
+    def reindex_search(batch_size=500):
+        """Rebuild search_vector for every article, in id order and batches."""
+        last_id = 0
+        total = 0
+        while True:
+            result = query(f"""
+                SELECT a.id, a.updated_at, a.title, a.summary, b.content FROM articles a
+                {Articles.BODY_JOIN_SQL}
+                WHERE a.id > %s ORDER BY a.id LIMIT %s
+            """, (last_id, batch_size))
+            rows = result['rows']
+            if not rows:
+                return total
+            
+            # One set-based UPDATE per batch; articles edited since they were
+            # read already have a fresh vector and are skipped
+            documents = [
+                Articles._search_document(row['title'], row['summary'], Articles._plain_text(row['content']))
+                for row in rows
+            ]
+            result = query(f"""
+                UPDATE articles a SET search_vector = {Articles.SEARCH_VECTOR_SQL % ('v.title', 'v.summary', 'v.content')}
+                FROM unnest(%s::int[], %s::timestamp[], %s::text[], %s::text[], %s::text[])
+                    AS v(id, updated_at, title, summary, content)
+                WHERE a.id = v.id AND a.updated_at = v.updated_at
+            """, (
+                [row['id'] for row in rows],
+                [row['updated_at'] for row in rows],
+                *(list(column) for column in zip(*documents))
+            ))
+            
+            last_id = rows[-1]['id']
+            total += result['rowcount']
+    
+    @staticmethod
+    def extract_inline_images(batch_size=100):
+        """
+        Move data: URI images out of existing articles' content (see
+        inline_images), in id order and batches. Returns the number of
+        articles rewritten; updated_at is left unchanged.
+        """
+        last_id = 0
+        total = 0
+        while True:
+            result = query("""
+                SELECT a.id, b.content, a.updated_at FROM article_bodies b
+                JOIN articles a ON a.id = b.article_id
+                WHERE b.article_id > %s AND b.content LIKE '%%data:image/%%'
+                ORDER BY b.article_id LIMIT %s
+            """, (last_id, batch_size))
+            rows = result['rows']
+            if not rows:
+                return total
+            
+            with transaction():
+                for row in rows:
+                    content = inline_images.extract(row['content'])
+                    if content == row['content']:
+                        continue
+                    # Skipped if the article was edited since it was read
+                    result = query("""
+                        UPDATE article_bodies b SET content = %s
+                        FROM articles a
+                        WHERE b.article_id = %s AND a.id = b.article_id AND a.updated_at = %s
+                    """, (content, row['id'], row['updated_at']))
+                    total += result['rowcount']
+            
+            last_id = rows[-1]['id']
+    
+    @staticmethod
+    def _load_relations(articles, tags=True, attachments=True):
+        """Attach tags and attachments to a list of article rows in batch."""
+        article_ids = [article['id'] for article in articles]
         
-        start = max(0, index - length)
-        end = min(len(text), index + len(search_term) + length)
+        if tags:
+            tags_by_article = Tags.get_by_article_ids(article_ids)
+            for article in articles:
+                article['tags'] = tags_by_article.get(article['id'], [])
         
-        snippet = text[start:end]
-        if start > 0:
-            snippet = '...' + snippet
-        if end < len(text):
-            snippet = snippet + '...'
+        if attachments:
+            attachments_by_article = Attachments.get_by_article_ids(article_ids)
+            for article in articles:
+                article['attachments'] = attachments_by_article.get(article['id'], [])
         
-        return snippet
-    
-    @staticmethod
-    def _get_match_field(article, search_term):
-        """Determine which field matched."""
-        term = search_term.lower()
-        if article.get('title') and term in article['title'].lower():
-            return 'title'
-        if article.get('summary') and term in article['summary'].lower():
-            return 'summary'
-        if article.get('content') and term in article['content'].lower():
-            return 'content'
-        return 'unknown'
+        return articles
     
     @staticmethod
     def get_stats():
@@ -2,18 +2,24 @@
 Attachments model for Knowledge Repository
 """
 
-from db import query
+from db import query, transaction
 
 
 class Attachments:
+    BY_ARTICLE_SQL = 'SELECT * FROM attachments WHERE article_id = %s ORDER BY created_at DESC'
+    
+    BY_ARTICLE_IDS_SQL = 'SELECT * FROM attachments WHERE article_id = ANY(%s) ORDER BY created_at DESC'
+    
+    CREATE_SQL = """
+        INSERT INTO attachments (article_id, file_name, mime_type, size, url)
+        VALUES (%s, %s, %s, %s, %s)
+        RETURNING *
+    """
+    
     @staticmethod
     def create(article_id=None, file_name=None, mime_type=None, size=None, url=None):
-        result = query("""
-            INSERT INTO attachments (article_id, file_name, mime_type, size, url)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING id
-        """, (article_id, file_name, mime_type, size, url))
-        return Attachments.get_by_id(result['rows'][0]['id'])
+        result = query(Attachments.CREATE_SQL, (article_id, file_name, mime_type, size, url))
+        return result['rows'][0]
     
     @staticmethod
     def get_by_id(id):
@@ -22,12 +28,26 @@ class Attachments:
     
     @staticmethod
     def get_by_article_id(article_id):
-        result = query(
-            'SELECT * FROM attachments WHERE article_id = %s ORDER BY created_at DESC',
-            (article_id,)
-        )
+        result = query(Attachments.BY_ARTICLE_SQL, (article_id,), prepare=True)
         return result['rows']
     
+    @staticmethod
+    def get_by_article_ids(article_ids):
+        """Get attachments for many articles in one query, keyed by article id."""
+        if not article_ids:
+            return {}
+        
+        result = query(Attachments.BY_ARTICLE_IDS_SQL, (list(article_ids),), prepare=True)
+        return Attachments._group_by_article(article_ids, result['rows'])
+    
+    @staticmethod
+    def _group_by_article(article_ids, rows):
+        """Group BY_ARTICLE_IDS_SQL rows into {article_id: [attachment, ...]}."""
+        attachments_by_article = {article_id: [] for article_id in article_ids}
+        for row in rows:
+            attachments_by_article.setdefault(row['article_id'], []).append(row)
+        return attachments_by_article
+    
     @staticmethod
     def detach_from_article(article_id):
         query('UPDATE attachments SET article_id = NULL WHERE article_id = %s', (article_id,))
@@ -37,9 +57,12 @@ class Attachments:
         if not attachment_ids:
             return
         
-        # Clear current links
-        Attachments.detach_from_article(article_id)
-        
-        # Assign new attachments
-        for att_id in attachment_ids:
-            query('UPDATE attachments SET article_id = %s WHERE id = %s', (article_id, att_id))
+        with transaction():
+            # Clear current links
+            Attachments.detach_from_article(article_id)
+            
+            # Assign new attachments
+            query(
+                'UPDATE attachments SET article_id = %s WHERE id = ANY(%s)',
+                (article_id, [int(att_id) for att_id in attachment_ids])
+            )
@@ -2,12 +2,18 @@
 Categories model for Knowledge Repository
 """
 
+import cache
 from db import query
 
 
 class Categories:
     @staticmethod
     def get_all():
+        return cache.get_or_load('categories', Categories.load_all)
+    
+    @staticmethod
+    def load_all():
+        """Uncached read; get_all() serves this through the cache."""
         result = query('SELECT * FROM categories ORDER BY name')
         return result['rows']
     
@@ -22,6 +28,7 @@ class Categories:
             'INSERT INTO categories (name, description, created_by) VALUES (%s, %s, %s) RETURNING id',
             (name, description, creator_id)
         )
+        cache.invalidate('categories')
         return {
             'id': result['rows'][0]['id'],
             'name': name,
@@ -35,11 +42,13 @@ class Categories:
             'UPDATE categories SET name = %s, description = %s WHERE id = %s',
             (name, description, id)
         )
+        cache.invalidate('categories')
         return Categories.get_by_id(id)
     
     @staticmethod
     def delete(id):
         query('DELETE FROM categories WHERE id = %s', (id,))
+        cache.invalidate('categories')
         return True
     
     @staticmethod
@@ -2,12 +2,18 @@
 Departments model for Knowledge Repository
 """
 
+import cache
 from db import query
 
 
 class Departments:
     @staticmethod
     def get_all():
+        return cache.get_or_load('departments', Departments.load_all)
+    
+    @staticmethod
+    def load_all():
+        """Uncached read; get_all() serves this through the cache."""
         result = query('SELECT * FROM departments ORDER BY name')
         return result['rows']
     
@@ -22,6 +28,7 @@ class Departments:
             'INSERT INTO departments (name, description, created_by) VALUES (%s, %s, %s) RETURNING id',
             (name, description, creator_id)
         )
+        cache.invalidate('departments')
         return {
             'id': result['rows'][0]['id'],
             'name': name,
@@ -35,11 +42,13 @@ class Departments:
             'UPDATE departments SET name = %s, description = %s WHERE id = %s',
             (name, description, id)
         )
+        cache.invalidate('departments')
         return Departments.get_by_id(id)
     
     @staticmethod
     def delete(id):
         query('DELETE FROM departments WHERE id = %s', (id,))
+        cache.invalidate('departments')
         return True
     
     @staticmethod
@@ -2,12 +2,18 @@
 Priorities model for Knowledge Repository
 """
 
+import cache
 from db import query
 
 
 class Priorities:
     @staticmethod
     def get_all():
+        return cache.get_or_load('priorities', Priorities.load_all)
+    
+    @staticmethod
+    def load_all():
+        """Uncached read; get_all() serves this through the cache."""
         result = query('SELECT * FROM priorities ORDER BY level DESC')
         return result['rows']
     
@@ -22,6 +28,7 @@ class Priorities:
             'INSERT INTO priorities (name, level, color, created_by) VALUES (%s, %s, %s, %s) RETURNING id',
             (name, level, color, creator_id)
         )
+        cache.invalidate('priorities')
         return {
             'id': result['rows'][0]['id'],
             'name': name,
@@ -36,11 +43,13 @@ class Priorities:
             'UPDATE priorities SET name = %s, level = %s, color = %s WHERE id = %s',
             (name, level, color, id)
         )
+        cache.invalidate('priorities')
         return Priorities.get_by_id(id)
     
     @staticmethod
     def delete(id):
         query('DELETE FROM priorities WHERE id = %s', (id,))
+        cache.invalidate('priorities')
         return True
     
     @staticmethod
@@ -2,7 +2,7 @@
 Recently Viewed model for Knowledge Repository
 """
 
-from db import query
+from db import query, transaction
 
 
 class RecentlyViewed:
@@ -28,33 +28,39 @@ class RecentlyViewed:
         return result['rows']
     
     @staticmethod
-    def add_view(user_id, article_id):
-        # Use ON CONFLICT to update viewed_at if already exists
-        query("""
-            INSERT INTO recently_viewed (user_id, article_id, viewed_at)
-            VALUES (%s, %s, CURRENT_TIMESTAMP)
-            ON CONFLICT (user_id, article_id)
-            DO UPDATE SET viewed_at = CURRENT_TIMESTAMP
-        """, (user_id, article_id))
+    def add_views(views):
+        """
+        Record many views ({(user_id, article_id): viewed_at}) with one upsert,
+        then trim each affected user's history to the last 20 / 3 days.
+        Views of articles or users deleted in the meantime are skipped.
+        """
+        if not views:
+            return {'success': True}
         
-        # Keep only last 20 for this user
-        query("""
-            DELETE FROM recently_viewed
-            WHERE user_id = %s
-            AND id NOT IN (
-                SELECT id FROM recently_viewed
-                WHERE user_id = %s
-                ORDER BY viewed_at DESC
-                LIMIT 20
-            )
-        """, (user_id, user_id))
-        
-        # Delete entries older than 3 days
-        query("""
-            DELETE FROM recently_viewed
-            WHERE user_id = %s
-            AND viewed_at < NOW() - INTERVAL '3 days'
-        """, (user_id,))
+        with transaction():
+            keys = sorted(views)
+            user_ids = [user_id for user_id, _ in keys]
+            query("""
+                INSERT INTO recently_viewed (user_id, article_id, viewed_at)
+                SELECT v.user_id, v.article_id, v.viewed_at
+                FROM unnest(%s::int[], %s::int[], %s::timestamptz[]) AS v(user_id, article_id, viewed_at)
+                JOIN articles a ON a.id = v.article_id
+                JOIN users u ON u.id = v.user_id
+                ON CONFLICT (user_id, article_id)
+                DO UPDATE SET viewed_at = GREATEST(recently_viewed.viewed_at, EXCLUDED.viewed_at)
+            """, (user_ids, [article_id for _, article_id in keys], [views[key] for key in keys]))
+            
+            # Keep only the last 20 entries from the last 3 days for these users
+            query("""
+                DELETE FROM recently_viewed rv
+                USING (
+                    SELECT id, row_number() OVER (PARTITION BY user_id ORDER BY viewed_at DESC) AS position
+                    FROM recently_viewed
+                    WHERE user_id = ANY(%s)
+                ) ranked
+                WHERE rv.id = ranked.id
+                AND (ranked.position > 20 OR rv.viewed_at < NOW() - INTERVAL '3 days')
+            """, (sorted(set(user_ids)),))
         
         return {'success': True}
     
@@ -2,12 +2,39 @@
 Tags model for Knowledge Repository
 """
 
-from db import query
+import cache
+from db import query, escape_like
 
 
 class Tags:
+    BY_ARTICLE_SQL = """
+        SELECT t.* FROM tags t
+        JOIN article_tags at ON t.id = at.tag_id
+        WHERE at.article_id = %s
+        ORDER BY t.name
+    """
+    
+    BY_ARTICLE_IDS_SQL = """
+        SELECT at.article_id, t.* FROM tags t
+        JOIN article_tags at ON t.id = at.tag_id
+        WHERE at.article_id = ANY(%s)
+        ORDER BY t.name
+    """
+    
+    SUGGEST_SQL = """
+        SELECT id, name FROM tags
+        WHERE name ILIKE %s
+        ORDER BY name ILIKE %s DESC, length(name), name
+        LIMIT %s
+    """
+    
     @staticmethod
     def get_all():
+        return cache.get_or_load('tags', Tags.load_all)
+    
+    @staticmethod
+    def load_all():
+        """Uncached read; get_all() serves this through the cache."""
         result = query('SELECT * FROM tags ORDER BY name')
         return result['rows']
     
@@ -21,34 +48,86 @@ class Tags:
         result = query('SELECT * FROM tags WHERE name = %s', (name,))
         return result['rows'][0] if result['rows'] else None
     
+    @staticmethod
+    def suggest(term, limit=5):
+        """Tag names containing term, prefix matches first (trigram-indexed)."""
+        pattern = escape_like(term)
+        result = query(Tags.SUGGEST_SQL, (f'%{pattern}%', f'{pattern}%', limit))
+        return result['rows']
+    
     @staticmethod
     def create(name, creator_id=None):
-        # Check if tag already exists
-        existing = Tags.get_by_name(name)
-        if existing:
-            return existing
+        return Tags.get_or_create_many([name], creator_id)[0]
+    
+    @staticmethod
+    def get_or_create_many(names, creator_id=None):
+        """
+        Get tags by name, creating the missing ones in one statement.
+        Safe against concurrent creation of the same name. Returns tags in
+        the order of names.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return []
         
-        result = query(
-            'INSERT INTO tags (name, created_by) VALUES (%s, %s) RETURNING id',
-            (name, creator_id)
-        )
-        return {
-            'id': result['rows'][0]['id'],
-            'name': name,
-            'created_by': creator_id
-        }
+        result = query("""
+            WITH input AS (
+                SELECT DISTINCT unnest(%s::text[]) AS name
+            ),
+            inserted AS (
+                INSERT INTO tags (name, created_by)
+                SELECT name, %s FROM input ORDER BY name
+                ON CONFLICT (name) DO NOTHING
+                RETURNING *
+            )
+            SELECT *, true AS created FROM inserted
+            UNION ALL
+            SELECT t.*, false AS created FROM tags t JOIN input i ON i.name = t.name
+        """, (names, creator_id))
+        
+        tags_by_name = {row['name']: row for row in result['rows']}
+        if any(row['created'] for row in result['rows']):
+            cache.invalidate('tags')
+        
+        # A tag committed by a concurrent transaction after this statement's
+        # snapshot was skipped by ON CONFLICT but not visible to it; re-read
+        missing = [name for name in names if name not in tags_by_name]
+        if missing:
+            result = query('SELECT * FROM tags WHERE name = ANY(%s)', (missing,))
+            tags_by_name.update((row['name'], row) for row in result['rows'])
+        
+        tags = []
+        for name in names:
+            tag = dict(tags_by_name[name])
+            tag.pop('created', None)
+            tags.append(tag)
+        return tags
     
     @staticmethod
     def delete(id):
         query('DELETE FROM tags WHERE id = %s', (id,))
+        cache.invalidate('tags')
         return True
     
     @staticmethod
     def get_by_article_id(article_id):
-        result = query("""
-            SELECT t.* FROM tags t
-            JOIN article_tags at ON t.id = at.tag_id
-            WHERE at.article_id = %s
-            ORDER BY t.name
-        """, (article_id,))
+        result = query(Tags.BY_ARTICLE_SQL, (article_id,), prepare=True)
         return result['rows']
+    
+    @staticmethod
+    def get_by_article_ids(article_ids):
+        """Get tags for many articles in one query, keyed by article id."""
+        if not article_ids:
+            return {}
+        
+        result = query(Tags.BY_ARTICLE_IDS_SQL, (list(article_ids),), prepare=True)
+        return Tags._group_by_article(article_ids, result['rows'])
+    
+    @staticmethod
+    def _group_by_article(article_ids, rows):
+        """Group BY_ARTICLE_IDS_SQL rows into {article_id: [tag, ...]}."""
+        tags_by_article = {article_id: [] for article_id in article_ids}
+        for row in rows:
+            article_id = row.pop('article_id')
+            tags_by_article.setdefault(article_id, []).append(row)
+        return tags_by_article
@@ -2,21 +2,25 @@
 Users model for Knowledge Repository
 """
 
-from db import query
+from db import query, transaction
 
 
 class Users:
+    BY_EMAIL_SQL = 'SELECT * FROM users WHERE email = %s'
+    
+    # Never includes password_hash
+    BY_ID_SQL = 'SELECT id, email, role, approved, is_root, created_at, last_login_at FROM users WHERE id = %s'
+    
+    UPDATE_LAST_LOGIN_SQL = 'UPDATE users SET last_login_at = CURRENT_TIMESTAMP WHERE id = %s'
+    
     @staticmethod
     def get_by_email(email):
-        result = query('SELECT * FROM users WHERE email = %s', (email,))
+        result = query(Users.BY_EMAIL_SQL, (email,), prepare=True)
         return result['rows'][0] if result['rows'] else None
     
     @staticmethod
     def get_by_id(id):
-        result = query(
-            'SELECT id, email, role, approved, is_root, created_at, last_login_at FROM users WHERE id = %s',
-            (id,)
-        )
+        result = query(Users.BY_ID_SQL, (id,), prepare=True)
         return result['rows'][0] if result['rows'] else None
     
     @staticmethod
@@ -29,7 +33,7 @@ class Users:
     
     @staticmethod
     def update_last_login(id):
-        query('UPDATE users SET last_login_at = CURRENT_TIMESTAMP WHERE id = %s', (id,))
+        query(Users.UPDATE_LAST_LOGIN_SQL, (id,))
     
     @staticmethod
     def update_role(id, role):
@@ -56,10 +60,11 @@ class Users:
     
     @staticmethod
     def delete(id):
-        # Check if user is root
-        user = Users.get_by_id(id)
-        if user and user.get('is_root'):
-            raise Exception('Cannot delete root user')
-        
-        query('DELETE FROM users WHERE id = %s', (id,))
-        return True
+        with transaction():
+            # Check if user is root
+            user = Users.get_by_id(id)
+            if user and user.get('is_root'):
+                raise Exception('Cannot delete root user')
+            
+            query('DELETE FROM users WHERE id = %s', (id,))
+            return True
@@ -0,0 +1,17 @@
+"""
+Async database models for Knowledge Repository (ASGI mode)
+Awaitable counterparts of the models package for the routes served natively
+by asgi.py; SQL and pure helpers are shared with the sync models
+"""
+
+from models_async.tags import Tags
+from models_async.articles import Articles
+from models_async.attachments import Attachments
+from models_async.users import Users
+
+__all__ = [
+    'Tags',
+    'Articles',
+    'Attachments',
+    'Users'
+]
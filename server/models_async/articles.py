@@ -0,0 +1,104 @@
+"""
+Async Articles model for Knowledge Repository
+Read paths only; writes go through the sync model (see asgi.py)
+"""
+
+from db import escape_like
+from db_async import query, query_batch, stream_query
+from models.articles import Articles as SyncArticles
+from models.tags import Tags as SyncTags
+from models.attachments import Attachments as SyncAttachments
+
+
+class Articles:
+    @staticmethod
+    async def get_all(filters=None, fields=None):
+        sql, params = SyncArticles._build_list_query(filters, fields)
+        sql += " ORDER BY a.updated_at DESC, a.id DESC"
+        
+        result = await query(sql, params if params else None, compact=True, extra_fields=('tags', 'attachments'))
+        return await Articles._load_relations(result['rows'])
+    
+    @staticmethod
+    async def get_page(filters=None, limit=50, cursor=None, fields=None):
+        """Keyset page on (updated_at, id); same contract as the sync get_page()."""
+        sql, params, limit = SyncArticles._page_query(filters, limit, cursor, fields)
+        result = await query(sql, params, compact=True, extra_fields=('tags', 'attachments'))
+        page = SyncArticles._page_result(result['rows'], limit)
+        await Articles._load_relations(page['articles'])
+        return page
+    
+    @staticmethod
+    def stream(filters=None, fields=None, batch_size=500, body=False):
+        """Async generator of article batches; same contract as the sync stream()."""
+        sql, params = SyncArticles._stream_query(filters, fields, body)
+        # Relations are loaded on the stream's own connection
+        return stream_query(
+            sql, params, batch_size, extra_fields=('tags', 'attachments'), on_batch=Articles._load_relations
+        )
+    
+    @staticmethod
+    async def get_by_id(id):
+        # Article, tags and attachments pipelined in one round trip
+        articles, tags, attachments = await query_batch([
+            (SyncArticles._detail_sql(), (id,)),
+            (SyncTags.BY_ARTICLE_SQL, (id,)),
+            (SyncAttachments.BY_ARTICLE_SQL, (id,))
+        ])
+        
+        if not articles:
+            return None
+        
+        article = articles[0]
+        article['tags'] = tags
+        article['attachments'] = attachments
+        
+        return article
+    
+    @staticmethod
+    async def exists(id):
+        result = await query('SELECT 1 FROM articles WHERE id = %s', (id,))
+        return len(result['rows']) > 0
+    
+    @staticmethod
+    async def search(search_term, limit=50, offset=0):
+        """Ranked full-text search; same contract as the sync search()."""
+        search_query = SyncArticles._search_query(search_term, limit, offset)
+        if search_query is None:
+            return []
+        
+        articles = (await query(*search_query, compact=True, extra_fields=('tags',)))['rows']
+        return await Articles._load_relations(articles, attachments=False)
+    
+    @staticmethod
+    async def suggest(term, limit=8):
+        """Lightweight (id, title) matches for typeahead, prefix matches first."""
+        pattern = escape_like(term)
+        result = await query(SyncArticles.SUGGEST_SQL, (f'%{pattern}%', f'{pattern}%', limit))
+        return result['rows']
+    
+    @staticmethod
+    async def _load_relations(articles, tags=True, attachments=True):
+        """Attach tags and attachments to a list of article rows, pipelined in one round trip."""
+        if not articles:
+            return articles
+        
+        article_ids = [article['id'] for article in articles]
+        statements = []
+        if tags:
+            statements.append((SyncTags.BY_ARTICLE_IDS_SQL, (article_ids,)))
+        if attachments:
+            statements.append((SyncAttachments.BY_ARTICLE_IDS_SQL, (article_ids,)))
+        results = await query_batch(statements)
+        
+        if tags:
+            tags_by_article = SyncTags._group_by_article(article_ids, results.pop(0))
+            for article in articles:
+                article['tags'] = tags_by_article.get(article['id'], [])
+        
+        if attachments:
+            attachments_by_article = SyncAttachments._group_by_article(article_ids, results.pop(0))
+            for article in articles:
+                article['attachments'] = attachments_by_article.get(article['id'], [])
+        
+        return articles
@@ -0,0 +1,22 @@
+"""
+Async Attachments model for Knowledge Repository
+"""
+
+from db_async import query
+from models.attachments import Attachments as SyncAttachments
+
+
+class Attachments:
+    @staticmethod
+    async def create(article_id=None, file_name=None, mime_type=None, size=None, url=None):
+        result = await query(SyncAttachments.CREATE_SQL, (article_id, file_name, mime_type, size, url))
+        return result['rows'][0]
+    
+    @staticmethod
+    async def get_by_article_ids(article_ids):
+        """Get attachments for many articles in one query, keyed by article id."""
+        if not article_ids:
+            return {}
+        
+        result = await query(SyncAttachments.BY_ARTICLE_IDS_SQL, (list(article_ids),))
+        return SyncAttachments._group_by_article(article_ids, result['rows'])
@@ -0,0 +1,25 @@
+"""
+Async Tags model for Knowledge Repository
+"""
+
+from db import escape_like
+from db_async import query
+from models.tags import Tags as SyncTags
+
+
+class Tags:
+    @staticmethod
+    async def suggest(term, limit=5):
+        """Tag names containing term, prefix matches first (trigram-indexed)."""
+        pattern = escape_like(term)
+        result = await query(SyncTags.SUGGEST_SQL, (f'%{pattern}%', f'{pattern}%', limit))
+        return result['rows']
+    
+    @staticmethod
+    async def get_by_article_ids(article_ids):
+        """Get tags for many articles in one query, keyed by article id."""
+        if not article_ids:
+            return {}
+        
+        result = await query(SyncTags.BY_ARTICLE_IDS_SQL, (list(article_ids),))
+        return SyncTags._group_by_article(article_ids, result['rows'])
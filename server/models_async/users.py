@@ -0,0 +1,22 @@
+"""
+Async Users model for Knowledge Repository
+"""
+
+from db_async import query
+from models.users import Users as SyncUsers
+
+
+class Users:
+    @staticmethod
+    async def get_by_email(email):
+        result = await query(SyncUsers.BY_EMAIL_SQL, (email,))
+        return result['rows'][0] if result['rows'] else None
+    
+    @staticmethod
+    async def get_by_id(id):
+        result = await query(SyncUsers.BY_ID_SQL, (id,))
+        return result['rows'][0] if result['rows'] else None
+    
+    @staticmethod
+    async def update_last_login(id):
+        await query(SyncUsers.UPDATE_LAST_LOGIN_SQL, (id,))
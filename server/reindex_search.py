@@ -0,0 +1,34 @@
+"""
+Rebuild the article search index for Knowledge Repository
+Re-analyzes every article with the Hebrew-aware analyzer; run after upgrading
+or after changing analyzer rules
+"""
+
+import os
+import sys
+
+# Add server directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from db import init_database
+from models.articles import Articles
+
+
+def reindex_search():
+    print('Rebuilding article search index...')
+    
+    try:
+        init_database()
+        total = Articles.reindex_search()
+        print(f'Reindexed {total} articles.')
+        
+    except Exception as e:
+        print(f'Error rebuilding search index: {e}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    reindex_search()
@@ -12,6 +12,7 @@ from routes.attachments import attachments_bp
 from routes.users import users_bp
 from routes.favorites import favorites_bp
 from routes.recently_viewed import recently_viewed_bp
+from routes.imports import imports_bp
 
 
 def register_blueprints(app):
@@ -26,3 +27,4 @@ def register_blueprints(app):
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(favorites_bp, url_prefix='/api/favorites')
     app.register_blueprint(recently_viewed_bp, url_prefix='/api/recently-viewed')
+    app.register_blueprint(imports_bp, url_prefix='/api/import')
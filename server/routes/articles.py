@@ -2,32 +2,90 @@
 Articles routes for Knowledge Repository
 """
 
-from flask import Blueprint, request, jsonify
+import io
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+import view_events
+import bulk_import
+from json_provider import stream_json_array, stream_ndjson
 from auth import auth_required, get_current_user
+from instrumentation import query_budget
 from models.articles import Articles
+from models.tags import Tags
 
 articles_bp = Blueprint('articles', __name__)
 
 
+def _list_filters():
+    """Category, department and priority filters from the query string."""
+    filters = {
+        'category_id': request.args.get('category_id'),
+        'department_id': request.args.get('department_id'),
+        'priority_id': request.args.get('priority_id')
+    }
+    # Remove None values
+    return {k: v for k, v in filters.items() if v is not None}
+
+
+def _streamed(batches, fmt='json', filename=None):
+    """Stream article batches as a JSON array or NDJSON without building the whole body."""
+    dumps = current_app.json.dumps
+    if fmt == 'ndjson':
+        body, mimetype = stream_ndjson(batches, dumps), 'application/x-ndjson'
+    else:
+        body, mimetype = stream_json_array(batches, dumps), 'application/json'
+    
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    if filename:
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
+
+
 @articles_bp.route('', methods=['GET'])
+@query_budget(3)
 def get_all():
     """Get all articles with optional filters."""
     try:
-        filters = {
-            'category_id': request.args.get('category_id'),
-            'department_id': request.args.get('department_id'),
-            'priority_id': request.args.get('priority_id')
-        }
-        # Remove None values
-        filters = {k: v for k, v in filters.items() if v is not None}
+        filters = _list_filters()
+        fields = request.args.get('fields')
+        
+        # Streaming mode: ?stream=true sends the same array, read and encoded in batches
+        if request.args.get('stream', '').lower() in ('1', 'true'):
+            return _streamed(Articles.stream(filters, fields=fields))
         
-        articles = Articles.get_all(filters)
+        # Paginated mode: ?limit=N[&cursor=...] returns one page plus nextCursor
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        if limit is not None or cursor:
+            page = Articles.get_page(filters, limit=limit or 50, cursor=cursor, fields=fields)
+            return jsonify(page)
+        
+        articles = Articles.get_all(filters, fields=fields)
         return jsonify(articles)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@articles_bp.route('/export', methods=['GET'])
+@auth_required
+def export():
+    """Export articles with tags and attachments, streamed as NDJSON (default) or a JSON array."""
+    try:
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in ('ndjson', 'json'):
+            return jsonify({'error': 'format must be ndjson or json'}), 400
+        
+        batches = Articles.stream(_list_filters(), fields=request.args.get('fields'), body=True)
+        return _streamed(batches, fmt, filename='articles')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @articles_bp.route('/search', methods=['GET'])
+@query_budget(2)
 def search():
     """Search articles."""
     try:
@@ -35,13 +93,36 @@ def search():
         if not q:
             return jsonify([])
         
-        articles = Articles.search(q)
+        limit = request.args.get('limit', 50, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        
+        articles = Articles.search(q, limit=limit, offset=offset)
         return jsonify(articles)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@articles_bp.route('/suggest', methods=['GET'])
+@query_budget(2)
+def suggest():
+    """Typeahead suggestions: matching article titles and tag names."""
+    try:
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({'articles': [], 'tags': []})
+        
+        limit = max(1, min(request.args.get('limit', 8, type=int), 20))
+        
+        return jsonify({
+            'articles': Articles.suggest(q, limit),
+            'tags': Tags.suggest(q, limit)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @articles_bp.route('/stats', methods=['GET'])
+@query_budget(5)
 def get_stats():
     """Get article statistics."""
     try:
@@ -52,6 +133,7 @@ def get_stats():
 
 
 @articles_bp.route('/<int:id>', methods=['GET'])
+@query_budget(1)
 def get_by_id(id):
     """Get a single article by ID."""
     try:
@@ -59,8 +141,8 @@ def get_by_id(id):
         if not article:
             return jsonify({'error': 'Article not found'}), 404
         
-        # Increment view count
-        Articles.increment_views(id)
+        # Count the view; written to the database in the background
+        view_events.record_view(id)
         return jsonify(article)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -68,6 +150,7 @@ def get_by_id(id):
 
 @articles_bp.route('', methods=['POST'])
 @auth_required
+@query_budget(8)
 def create():
     """Create a new article."""
     try:
@@ -99,8 +182,33 @@ def create():
         return jsonify({'error': str(e)}), 500
 
 
+@articles_bp.route('/bulk', methods=['POST'])
+@auth_required
+@query_budget(10)
+def bulk_create():
+    """Create many articles from NDJSON (one article per line) or a JSON array."""
+    try:
+        if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+            # Read line by line (buffered: the raw stream reads lines a byte at a
+            # time); each line is decoded and validated as it is staged
+            rows = io.BufferedReader(request.stream, 64 * 1024)
+        else:
+            rows = request.get_json(silent=True)
+            if not isinstance(rows, list):
+                return jsonify({'error': 'Expected a JSON array or NDJSON of articles'}), 400
+        
+        current_user = get_current_user()
+        result = bulk_import.import_articles(rows, current_user['email'], current_user['id'])
+        return jsonify(result), 201 if result['created'] else 400
+        
+    except Exception as e:
+        print(f'Error importing articles: {e}')
+        return jsonify({'error': str(e)}), 500
+
+
 @articles_bp.route('/<int:id>', methods=['PUT'])
 @auth_required
+@query_budget(9)
 def update(id):
     """Update an article."""
     try:
@@ -140,6 +248,7 @@ def update(id):
 
 @articles_bp.route('/<int:id>', methods=['DELETE'])
 @auth_required
+@query_budget(2)
 def delete(id):
     """Delete an article."""
     try:
@@ -3,12 +3,13 @@ Attachments and Images upload routes for Knowledge Repository
 """
 
 import os
-import uuid
 from flask import Blueprint, request, jsonify
 from werkzeug.utils import secure_filename
+import metrics
 from auth import auth_required
 from config import config
 from models.attachments import Attachments
+from uploads import generate_unique_filename
 
 attachments_bp = Blueprint('attachments', __name__)
 
@@ -16,12 +17,6 @@ attachments_bp = Blueprint('attachments', __name__)
 os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
 
 
-def generate_unique_filename(original_filename):
-    """Generate a unique filename preserving extension."""
-    ext = os.path.splitext(original_filename)[1]
-    return f"{int(__import__('time').time() * 1000)}-{uuid.uuid4()}{ext}"
-
-
 @attachments_bp.route('/attachments', methods=['POST'])
 @auth_required
 def upload_attachment():
@@ -43,6 +38,7 @@ def upload_attachment():
         
         # Get file size
         file_size = os.path.getsize(filepath)
+        metrics.record_upload('attachment', file_size)
         
         # Generate URL
         file_url = f'/uploads/{filename}'
@@ -91,6 +87,7 @@ def upload_image():
         
         # Get file size
         file_size = os.path.getsize(filepath)
+        metrics.record_upload('image', file_size)
         
         # Generate URL
         file_url = f'/uploads/{filename}'
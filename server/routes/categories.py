@@ -3,18 +3,20 @@ Categories routes for Knowledge Repository
 """
 
 from flask import Blueprint, request, jsonify
+import cache
 from auth import auth_required, get_current_user
+from instrumentation import query_budget
 from models.categories import Categories
 
 categories_bp = Blueprint('categories', __name__)
 
 
 @categories_bp.route('', methods=['GET'])
+@query_budget(1)
 def get_all():
     """Get all categories."""
     try:
-        categories = Categories.get_all()
-        return jsonify(categories)
+        return cache.conditional_response('categories', Categories.load_all)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
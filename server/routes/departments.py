@@ -3,18 +3,20 @@ Departments routes for Knowledge Repository
 """
 
 from flask import Blueprint, request, jsonify
+import cache
 from auth import auth_required, get_current_user
+from instrumentation import query_budget
 from models.departments import Departments
 
 departments_bp = Blueprint('departments', __name__)
 
 
 @departments_bp.route('', methods=['GET'])
+@query_budget(1)
 def get_all():
     """Get all departments."""
     try:
-        departments = Departments.get_all()
-        return jsonify(departments)
+        return cache.conditional_response('departments', Departments.load_all)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
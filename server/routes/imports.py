@@ -0,0 +1,58 @@
+"""
+Document import routes for Knowledge Repository
+"""
+
+import os
+import mimetypes
+from flask import Blueprint, request, jsonify
+import converter
+import uploads
+from auth import auth_required
+from db import transaction
+from models.attachments import Attachments
+
+imports_bp = Blueprint('imports', __name__)
+
+
+@imports_bp.route('', methods=['POST'])
+@auth_required
+def import_documents():
+    """
+    Convert uploaded DOCX, HTML or Markdown files (form-data, one or more
+    `file` fields) to article HTML. Files convert in parallel in the
+    conversion pool; embedded images become attachments.
+    """
+    try:
+        files = [file for file in request.files.getlist('file') if file.filename]
+        if not files:
+            return jsonify({'error': 'File is required'}), 400
+        
+        documents = converter.convert_many([(file.filename, file.read()) for file in files])
+        
+        # Image files saved here are deleted again if the transaction rolls back
+        with transaction():
+            for document in documents:
+                if 'images' in document:
+                    _store_images(document)
+        
+        return jsonify({'documents': documents})
+        
+    except converter.ConverterBusy as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        print(f'Document import error: {e}')
+        return jsonify({'error': str(e)}), 500
+
+
+def _store_images(document):
+    """Save a converted document's images as attachments and point the HTML at them."""
+    stem = os.path.splitext(document['fileName'])[0]
+    document['attachments'] = []
+    for index, (mime_type, data) in enumerate(document.pop('images')):
+        file_name = f'{stem}-image-{index + 1}{mimetypes.guess_extension(mime_type) or ""}'
+        url = uploads.save_bytes(data, file_name, mime_type)
+        attachment = Attachments.create(file_name=file_name, mime_type=mime_type, size=len(data), url=url)
+        document['attachments'].append(attachment)
+        document['html'] = document['html'].replace(
+            f'"{converter.IMAGE_PLACEHOLDER.format(index)}"', f'"{url}"'
+        )
@@ -3,18 +3,20 @@ Priorities routes for Knowledge Repository
 """
 
 from flask import Blueprint, request, jsonify
+import cache
 from auth import auth_required, get_current_user
+from instrumentation import query_budget
 from models.priorities import Priorities
 
 priorities_bp = Blueprint('priorities', __name__)
 
 
 @priorities_bp.route('', methods=['GET'])
+@query_budget(1)
 def get_all():
     """Get all priorities."""
     try:
-        priorities = Priorities.get_all()
-        return jsonify(priorities)
+        return cache.conditional_response('priorities', Priorities.load_all)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2,6 +2,7 @@
 Recently Viewed routes for Knowledge Repository
 """
 
+from datetime import datetime, timezone
 from flask import Blueprint, jsonify
 from auth import auth_required, get_current_user
 from models.recently_viewed import RecentlyViewed
@@ -29,12 +30,13 @@ def add_recently_viewed(article_id):
     """Add article to recently viewed."""
     try:
         # Check if article exists
-        article = Articles.get_by_id(article_id)
-        if not article:
+        if not Articles.exists(article_id):
             return jsonify({'error': 'Article not found'}), 404
         
+        # Written now, so the user's list shows it on the next read; the view
+        # itself was counted (in the background) by GET /api/articles/<id>
         current_user = get_current_user()
-        RecentlyViewed.add_view(current_user['id'], article_id)
+        RecentlyViewed.add_views({(int(current_user['id']), article_id): datetime.now(timezone.utc)})
         return jsonify({'success': True, 'articleId': article_id})
         
     except Exception as e:
@@ -3,18 +3,20 @@ Tags routes for Knowledge Repository
 """
 
 from flask import Blueprint, request, jsonify
+import cache
 from auth import auth_required, get_current_user
+from instrumentation import query_budget
 from models.tags import Tags
 
 tags_bp = Blueprint('tags', __name__)
 
 
 @tags_bp.route('', methods=['GET'])
+@query_budget(1)
 def get_all():
     """Get all tags."""
     try:
-        tags = Tags.get_all()
-        return jsonify(tags)
+        return cache.conditional_response('tags', Tags.load_all)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
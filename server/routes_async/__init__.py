@@ -0,0 +1,16 @@
+"""
+Async (Quart) routes for Knowledge Repository
+Natively async versions of the read-heavy and upload endpoints, with the same
+URLs, parameters and responses as the Flask blueprints in routes/
+"""
+
+from routes_async.auth import auth_bp
+from routes_async.articles import articles_bp
+from routes_async.attachments import attachments_bp
+
+
+def register_blueprints(app):
+    """Register all async blueprints with the Quart app."""
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(articles_bp, url_prefix='/api/articles')
+    app.register_blueprint(attachments_bp, url_prefix='/api')
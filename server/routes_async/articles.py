@@ -0,0 +1,94 @@
+"""
+Async articles routes for Knowledge Repository
+"""
+
+from quart import Blueprint, Response, request, jsonify, current_app
+import view_events
+from json_provider import astream_json_array
+from models_async.articles import Articles
+from models_async.tags import Tags
+
+articles_bp = Blueprint('articles', __name__)
+
+
+@articles_bp.route('', methods=['GET'])
+async def get_all():
+    """Get all articles with optional filters."""
+    try:
+        filters = {
+            'category_id': request.args.get('category_id'),
+            'department_id': request.args.get('department_id'),
+            'priority_id': request.args.get('priority_id')
+        }
+        # Remove None values
+        filters = {k: v for k, v in filters.items() if v is not None}
+        fields = request.args.get('fields')
+        
+        # Streaming mode: ?stream=true sends the same array, read and encoded in batches
+        if request.args.get('stream', '').lower() in ('1', 'true'):
+            body = astream_json_array(Articles.stream(filters, fields=fields), current_app.json.dumps)
+            return Response(body, mimetype='application/json')
+        
+        # Paginated mode: ?limit=N[&cursor=...] returns one page plus nextCursor
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        if limit is not None or cursor:
+            page = await Articles.get_page(filters, limit=limit or 50, cursor=cursor, fields=fields)
+            return jsonify(page)
+        
+        articles = await Articles.get_all(filters, fields=fields)
+        return jsonify(articles)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@articles_bp.route('/search', methods=['GET'])
+async def search():
+    """Search articles."""
+    try:
+        q = request.args.get('q', '')
+        if not q:
+            return jsonify([])
+        
+        limit = request.args.get('limit', 50, type=int)
+        offset = request.args.get('offset', 0, type=int)
+        
+        articles = await Articles.search(q, limit=limit, offset=offset)
+        return jsonify(articles)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@articles_bp.route('/suggest', methods=['GET'])
+async def suggest():
+    """Typeahead suggestions: matching article titles and tag names."""
+    try:
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({'articles': [], 'tags': []})
+        
+        limit = max(1, min(request.args.get('limit', 8, type=int), 20))
+        
+        return jsonify({
+            'articles': await Articles.suggest(q, limit),
+            'tags': await Tags.suggest(q, limit)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@articles_bp.route('/<int:id>', methods=['GET'])
+async def get_by_id(id):
+    """Get a single article by ID."""
+    try:
+        article = await Articles.get_by_id(id)
+        if not article:
+            return jsonify({'error': 'Article not found'}), 404
+        
+        # Count the view; written to the database in the background
+        view_events.record_view(id)
+        return jsonify(article)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
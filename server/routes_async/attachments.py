@@ -0,0 +1,99 @@
+"""
+Async attachments and images upload routes for Knowledge Repository
+The request body is received without holding a thread, however slow the client
+"""
+
+import os
+from quart import Blueprint, request, jsonify
+from werkzeug.utils import secure_filename
+import metrics
+from auth_async import auth_required
+from config import config
+from models_async.attachments import Attachments
+from uploads import generate_unique_filename
+
+attachments_bp = Blueprint('attachments', __name__)
+
+
+@attachments_bp.route('/attachments', methods=['POST'])
+@auth_required
+async def upload_attachment():
+    """Upload a file attachment."""
+    try:
+        files = await request.files
+        if 'file' not in files:
+            return jsonify({'error': 'File is required'}), 400
+        
+        file = files['file']
+        if file.filename == '':
+            return jsonify({'error': 'File is required'}), 400
+        
+        # Generate unique filename
+        filename = generate_unique_filename(secure_filename(file.filename))
+        filepath = os.path.join(config.UPLOAD_FOLDER, filename)
+        
+        # Save file
+        await file.save(filepath)
+        
+        # Get file size
+        file_size = os.path.getsize(filepath)
+        metrics.record_upload('attachment', file_size)
+        
+        # Get article_id if provided
+        form = await request.form
+        article_id = form.get('articleId')
+        
+        # Create attachment record
+        attachment = await Attachments.create(
+            article_id=article_id if article_id else None,
+            file_name=file.filename,
+            mime_type=file.content_type,
+            size=file_size,
+            url=f'/uploads/{filename}'
+        )
+        
+        return jsonify(attachment), 201
+        
+    except Exception as e:
+        print(f'Attachment upload error: {e}')
+        return jsonify({'error': str(e)}), 500
+
+
+@attachments_bp.route('/images', methods=['POST'])
+@auth_required
+async def upload_image():
+    """Upload an inline image for article content."""
+    try:
+        files = await request.files
+        if 'file' not in files:
+            return jsonify({'error': 'Image file is required'}), 400
+        
+        file = files['file']
+        if file.filename == '':
+            return jsonify({'error': 'Image file is required'}), 400
+        
+        # Check if it's an image
+        if not file.content_type or not file.content_type.startswith('image/'):
+            return jsonify({'error': 'Only image files are allowed'}), 400
+        
+        # Generate unique filename
+        filename = generate_unique_filename(secure_filename(file.filename))
+        filepath = os.path.join(config.UPLOAD_FOLDER, filename)
+        
+        # Save file
+        await file.save(filepath)
+        
+        # Get file size
+        file_size = os.path.getsize(filepath)
+        metrics.record_upload('image', file_size)
+        
+        return jsonify({
+            'url': f'/uploads/{filename}',
+            'fileName': file.filename,
+            'mimeType': file.content_type,
+            'size': file_size
+        }), 201
+        
+    except Exception as e:
+        print(f'Image upload error: {e}')
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,64 @@
+"""
+Async authentication routes for Knowledge Repository
+"""
+
+import asyncio
+from quart import Blueprint, request, jsonify
+from auth import verify_password, create_token
+from auth_async import auth_required, get_current_user
+from models_async.users import Users
+
+auth_bp = Blueprint('auth', __name__)
+
+
+@auth_bp.route('/login', methods=['POST'])
+async def login():
+    """Login a user."""
+    try:
+        data = await request.get_json()
+        email = data.get('email')
+        password = data.get('password')
+        
+        user = await Users.get_by_email(email)
+        # PBKDF2 is CPU-bound; keep it off the event loop
+        if not user or not await asyncio.to_thread(verify_password, password, user['password_hash']):
+            return jsonify({'error': 'Invalid email or password'}), 401
+        
+        # Check approval status
+        if not user.get('approved') and not user.get('is_root'):
+            return jsonify({'error': 'Account is pending admin approval'}), 403
+        
+        # Update last login
+        await Users.update_last_login(user['id'])
+        
+        # Create JWT token
+        token = create_token({
+            'id': user['id'],
+            'email': user['email'],
+            'role': user['role']
+        })
+        
+        return jsonify({
+            'user': {
+                'id': user['id'],
+                'email': user['email'],
+                'role': user['role'],
+                'approved': user.get('approved')
+            },
+            'session': {
+                'access_token': token,
+                'token_type': 'bearer'
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@auth_bp.route('/me', methods=['GET'])
+@auth_required
+async def get_me():
+    """Get current user info."""
+    current_user = get_current_user()
+    user = await Users.get_by_id(current_user['id'])
+    return jsonify({'user': user})
@@ -0,0 +1,211 @@
+"""
+Slow query log for Knowledge Repository
+Records statements slower than SLOW_QUERY_MS, grouped by normalized SQL
+fingerprint, and optionally captures EXPLAIN (ANALYZE, BUFFERS) plans for a
+sample of slow SELECTs in a ring buffer
+"""
+
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from config import config
+from db import add_query_listener, get_pool
+
+# Durations kept per fingerprint for percentiles
+MAX_DURATIONS = 500
+MAX_CALLERS = 5
+
+_lock = threading.Lock()
+_fingerprints = {}  # fingerprint -> stats dict
+_explains = deque(maxlen=config.SLOW_QUERY_EXPLAIN_BUFFER)
+_explain_queue = queue.Queue(maxsize=10)
+_explain_worker_pid = None
+
+_SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+_INTERNAL_FILES = {
+    os.path.join(_SERVER_DIR, 'db.py'),
+    os.path.join(_SERVER_DIR, 'db_async.py'),
+    os.path.abspath(__file__)
+}
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s')
+_LIST_RE = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def enable():
+    """Start recording slow statements (no-op if SLOW_QUERY_MS is 0)."""
+    if config.SLOW_QUERY_MS > 0:
+        add_query_listener(record)
+
+
+def fingerprint(sql):
+    """Normalize SQL so statements differing only in values group together."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _LIST_RE.sub('(...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def record(sql, params, duration):
+    """Query listener: aggregate statements over the threshold."""
+    duration_ms = duration * 1000
+    if duration_ms < config.SLOW_QUERY_MS:
+        return
+
+    key = fingerprint(sql)
+    caller = _caller()
+    shape = _params_shape(params)
+
+    with _lock:
+        stats = _fingerprints.get(key)
+        if stats is None:
+            stats = _fingerprints[key] = {
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'durations': deque(maxlen=MAX_DURATIONS),
+                'callers': {},
+                'params_shape': shape,
+                'last_seen': None
+            }
+        stats['count'] += 1
+        stats['total_ms'] += duration_ms
+        stats['max_ms'] = max(stats['max_ms'], duration_ms)
+        stats['durations'].append(duration_ms)
+        if caller in stats['callers'] or len(stats['callers']) < MAX_CALLERS:
+            stats['callers'][caller] = stats['callers'].get(caller, 0) + 1
+        stats['last_seen'] = datetime.now(timezone.utc).isoformat()
+
+    if _is_read_only(sql) and random.random() < config.SLOW_QUERY_EXPLAIN_SAMPLE:
+        _queue_explain(key, sql, params, duration_ms)
+
+
+def report():
+    """Aggregated slow-query report, slowest total time first."""
+    with _lock:
+        rows = []
+        for key, stats in _fingerprints.items():
+            durations = sorted(stats['durations'])
+            rows.append({
+                'fingerprint': key,
+                'count': stats['count'],
+                'total_ms': round(stats['total_ms'], 2),
+                'p50_ms': round(_percentile(durations, 50), 2),
+                'p99_ms': round(_percentile(durations, 99), 2),
+                'max_ms': round(stats['max_ms'], 2),
+                'callers': dict(stats['callers']),
+                'params_shape': stats['params_shape'],
+                'last_seen': stats['last_seen']
+            })
+        explains = list(_explains)
+
+    rows.sort(key=lambda row: row['total_ms'], reverse=True)
+    return {
+        'threshold_ms': config.SLOW_QUERY_MS,
+        'queries': rows,
+        'explains': explains
+    }
+
+
+def reset():
+    """Clear all recorded statements and captured plans."""
+    with _lock:
+        _fingerprints.clear()
+        _explains.clear()
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[int(index)]
+
+
+def _params_shape(params):
+    """Types of the parameters (never their values), e.g. ['int', 'str', 'list[3]']."""
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return {name: _value_shape(value) for name, value in params.items()}
+    return [_value_shape(value) for value in params]
+
+
+def _value_shape(value):
+    if isinstance(value, (list, tuple)):
+        return f'{type(value).__name__}[{len(value)}]'
+    return type(value).__name__
+
+
+def _caller():
+    """First stack frame outside the DB layer, e.g. 'models/articles.py:120 get_all'."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename not in _INTERNAL_FILES and 'contextlib' not in filename:
+            path = os.path.relpath(filename, _SERVER_DIR) if filename.startswith(_SERVER_DIR) else filename
+            return f'{path}:{frame.f_lineno} {frame.f_code.co_name}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+def _is_read_only(sql):
+    """EXPLAIN ANALYZE executes the statement, so only plain SELECTs are sampled."""
+    normalized = sql.lstrip().upper()
+    return normalized.startswith('SELECT') and not re.search(
+        r'\b(INSERT|UPDATE|DELETE|FOR UPDATE|FOR SHARE|NEXTVAL|SETVAL)\b', normalized
+    )
+
+
+def _queue_explain(key, sql, params, duration_ms):
+    global _explain_worker_pid
+    if _explain_worker_pid != os.getpid():
+        with _lock:
+            if _explain_worker_pid != os.getpid():
+                threading.Thread(target=_run_explains, name='slow-query-explain', daemon=True).start()
+                _explain_worker_pid = os.getpid()
+    try:
+        _explain_queue.put_nowait((key, sql, params, duration_ms))
+    except queue.Full:
+        pass
+
+
+def _run_explains():
+    while True:
+        key, sql, params, duration_ms = _explain_queue.get()
+        plan = _explain(sql, params)
+        with _lock:
+            _explains.append({
+                'fingerprint': key,
+                'duration_ms': round(duration_ms, 2),
+                'captured_at': datetime.now(timezone.utc).isoformat(),
+                'plan': plan
+            })
+
+
+def _explain(sql, params):
+    """Run EXPLAIN (ANALYZE, BUFFERS) on a separate connection, always rolled back."""
+    conn = None
+    started = time.perf_counter()
+    try:
+        conn = get_pool().getconn(timeout=1)
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL statement_timeout = %s", (config.SLOW_QUERY_EXPLAIN_TIMEOUT_MS,))
+            cur.execute('EXPLAIN (ANALYZE, BUFFERS) ' + sql, params)
+            plan = '\n'.join(row[0] for row in cur.fetchall())
+        return plan
+    except Exception as e:
+        return f'EXPLAIN failed after {(time.perf_counter() - started) * 1000:.0f}ms: {e}'
+    finally:
+        if conn:
+            conn.rollback()
+            get_pool().putconn(conn)
@@ -0,0 +1,119 @@
+"""
+Tests for the Hebrew-aware search analyzer
+"""
+
+import analyzer
+
+
+def terms(tsquery):
+    return tsquery.split(' | ')
+
+
+def test_normalize_strips_niqqud_and_folds_final_letters():
+    assert analyzer.normalize('שָׁלוֹם') == 'שלומ'
+    assert analyzer.normalize('ךםןףץ') == 'כמנפצ'
+    assert analyzer.normalize('Hello') == 'hello'
+
+
+def test_normalize_removes_abbreviation_marks_inside_words():
+    assert analyzer.normalize('צה"ל') == 'צהל'
+    assert analyzer.normalize('ג׳ירפה') == 'גירפה'
+    assert analyzer.normalize('"שלום"') == '"שלומ"'
+
+
+def test_normalize_keeps_hebrew_punctuation():
+    # Maqaf is punctuation in the niqqud block and separates words
+    assert analyzer.normalize('בית־ספר') == 'בית־ספר'
+
+
+def test_normalize_empty():
+    assert analyzer.normalize('') == ''
+    assert analyzer.normalize(None) == ''
+
+
+def test_tokenize():
+    assert analyzer.tokenize('שָׁלוֹם, עולם! Hello-World 42') == ['שלומ', 'עולמ', 'hello', 'world', '42']
+    assert analyzer.tokenize('בית־ספר') == ['בית', 'ספר']
+
+
+def test_prefix_variants_shortest_prefix_first():
+    assert analyzer.prefix_variants('והמחשב') == ['המחשב', 'מחשב', 'חשב']
+    assert analyzer.prefix_variants('ושבבית') == ['שבבית', 'בבית', 'בית']
+
+
+def test_prefix_variants_stops_at_non_prefix_letter():
+    assert analyzer.prefix_variants('בדיקה') == ['דיקה']
+    assert analyzer.prefix_variants('דבר') == []
+
+
+def test_prefix_variants_keeps_minimum_stem():
+    assert analyzer.prefix_variants('בבית') == ['בית']
+    assert analyzer.prefix_variants('בית') == []
+    assert analyzer.prefix_variants('לב') == []
+
+
+def test_prefix_variants_ignores_non_hebrew():
+    assert analyzer.prefix_variants('hello') == []
+    assert analyzer.prefix_variants('42') == []
+
+
+def test_to_index_text():
+    assert analyzer.to_index_text('והמחשב שלום') == 'והמחשב המחשב מחשב חשב שלומ לומ'
+
+
+def test_to_index_text_skips_two_letter_stems():
+    assert all(len(term) >= analyzer.MIN_INDEX_STEM for term in analyzer.index_terms('בית שלום ומה'))
+
+
+def test_to_ts_query():
+    assert analyzer.to_ts_query('והמחשב') == "('והמחשב':* | 'המחשב' | 'מחשב' | 'חשב')"
+    assert analyzer.to_ts_query('מחשב  מלך') == "('מחשב':* | 'חשב') & 'מלכ':*"
+    assert analyzer.to_ts_query('hello world') == "'hello':* & 'world':*"
+
+
+def test_stripped_stems_match_but_only_words_as_typed_are_exact():
+    # 'מחשב' also finds 'חשב' through its stripped stem, but only 'מחשב'
+    # (and longer words) match the exact query that search ranks first
+    assert "'חשב'" in analyzer.to_ts_query('מחשב')
+    assert analyzer.to_exact_ts_query('מחשב') == "'מחשב':*"
+    assert analyzer.to_exact_ts_query('והמחשב מלך') == "'והמחשב':* & 'מלכ':*"
+    assert analyzer.to_exact_ts_query('') == ''
+
+
+def test_to_ts_query_without_words():
+    assert analyzer.to_ts_query('') == ''
+    assert analyzer.to_ts_query('?! -') == ''
+
+
+def test_to_highlight_query_marks_prefixed_forms():
+    query = terms(analyzer.to_highlight_query('בית'))
+    assert "'בית':*" in query
+    assert "'בבית':*" in query
+    assert "'ובבית':*" in query
+    assert len(query) == 1 + 7 + 49
+
+
+def test_to_highlight_query_marks_prefix_stripped_variants():
+    query = terms(analyzer.to_highlight_query('והמחשב'))
+    assert "'והמחשב':*" in query
+    assert "'המחשב'" in query
+    assert "'מחשב'" in query
+    assert "'במחשב'" in query
+
+
+def test_to_highlight_query_marks_both_final_letter_forms():
+    query = terms(analyzer.to_highlight_query('מלך'))
+    assert "'מלך':*" in query
+    assert "'מלכ':*" in query
+    assert "'המלכ':*" in query
+    assert "'מלך':*" in terms(analyzer.to_highlight_query('מלכ'))
+
+
+def test_to_highlight_query_strips_niqqud_and_keeps_other_words_as_typed():
+    assert terms(analyzer.to_highlight_query('Hello hello WORLD')) == ["'hello':*", "'world':*"]
+    assert "'שלום':*" in terms(analyzer.to_highlight_query('שָׁלוֹם'))
+
+
+def test_to_highlight_query_empty():
+    assert analyzer.to_highlight_query('') == ''
+    assert analyzer.to_highlight_query(None) == ''
@@ -0,0 +1,48 @@
+"""
+Tests for the Articles model
+"""
+
+from contextlib import contextmanager
+import models.articles
+from models.articles import Articles
+
+
+def record_queries(monkeypatch):
+    """Replace the model's query()/transaction() with ones that record each statement."""
+    statements = []
+    depth = [0]
+    
+    @contextmanager
+    def transaction():
+        depth[0] += 1
+        try:
+            yield None
+        finally:
+            depth[0] -= 1
+    
+    def query(sql, params=None, **kwargs):
+        statements.append((' '.join(sql.split()), params, depth[0] > 0))
+        return {'rows': [], 'rowcount': 0}
+    
+    monkeypatch.setattr(models.articles, 'query', query)
+    monkeypatch.setattr(models.articles, 'transaction', transaction)
+    return statements
+
+
+def test_add_views_locks_rows_in_id_order_before_updating(monkeypatch):
+    statements = record_queries(monkeypatch)
+    Articles.add_views({7: 2, 3: 1, 5: 4})
+    
+    (lock_sql, lock_params, lock_in_transaction), (update_sql, update_params, update_in_transaction) = statements
+    assert lock_sql == 'SELECT id FROM articles WHERE id = ANY(%s) ORDER BY id FOR UPDATE'
+    assert lock_params == ([3, 5, 7],)
+    assert update_sql.startswith('UPDATE articles')
+    assert update_params == ([3, 5, 7], [1, 4, 2])
+    # Both in one transaction, so the locks are held until the update commits
+    assert lock_in_transaction and update_in_transaction
+
+
+def test_add_views_without_views_runs_nothing(monkeypatch):
+    statements = record_queries(monkeypatch)
+    Articles.add_views({})
+    assert statements == []
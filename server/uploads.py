@@ -0,0 +1,78 @@
+"""
+Upload storage for Knowledge Repository
+Files are written to UPLOAD_FOLDER under unique names and served from /uploads
+"""
+
+import os
+import hashlib
+import time
+import uuid
+import mimetypes
+from werkzeug.utils import secure_filename
+import metrics
+from config import config
+from db import on_commit, on_rollback
+
+
+def generate_unique_filename(original_filename):
+    """Generate a unique filename preserving extension."""
+    ext = os.path.splitext(original_filename)[1]
+    return f"{int(time.time() * 1000)}-{uuid.uuid4()}{ext}"
+
+
+def save_bytes(data, original_filename, mime_type=None, kind='image'):
+    """
+    Store an in-memory file (e.g. an image extracted from a document) like an
+    uploaded one and return its URL. The extension comes from the original
+    name, or from mime_type when the name has none. Inside a transaction the
+    file is deleted again if it rolls back.
+    """
+    filename = secure_filename(original_filename or '')
+    if not os.path.splitext(filename)[1] and mime_type:
+        filename += mimetypes.guess_extension(mime_type) or ''
+    
+    filename = generate_unique_filename(filename)
+    path = os.path.join(config.UPLOAD_FOLDER, filename)
+    with open(path, 'wb') as f:
+        f.write(data)
+    # The name is unique, so nothing else can be using the file
+    on_rollback(lambda: _remove(path))
+    
+    metrics.record_upload(kind, len(data))
+    return f'/uploads/{filename}'
+
+
+def save_content_addressed(data, mime_type, kind='image'):
+    """
+    Store a file under a name derived from its SHA-256, so identical content
+    (e.g. the same logo in many articles) is written once; returns its URL.
+    
+    Inside a transaction the file only appears once it commits, and is
+    discarded if it rolls back: other articles may already use the same file,
+    so it can't be deleted afterwards.
+    """
+    filename = hashlib.sha256(data).hexdigest() + (mimetypes.guess_extension(mime_type) or '')
+    path = os.path.join(config.UPLOAD_FOLDER, filename)
+    
+    if not os.path.exists(path):
+        # Written under a temporary name, then renamed, so the file is never
+        # served half-written
+        temp_path = f'{path}.{uuid.uuid4()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        
+        def publish():
+            os.replace(temp_path, path)
+            metrics.record_upload(kind, len(data))
+        
+        on_rollback(lambda: _remove(temp_path))
+        on_commit(publish)
+    
+    return f'/uploads/{filename}'
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError as e:
+        print(f'Error removing upload {path}: {e}')
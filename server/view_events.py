@@ -0,0 +1,71 @@
+"""
+Write-behind pipeline for article view counts
+Views are aggregated in memory and flushed in batches by a background thread,
+so reading an article never writes to the database on the request path
+"""
+
+import atexit
+import os
+import threading
+from collections import Counter
+from config import config
+from models.articles import Articles
+
+_lock = threading.Lock()
+_view_counts = Counter()  # article_id -> pending views
+_wakeup = threading.Event()
+_flusher = None
+_flusher_pid = None
+
+
+def record_view(article_id):
+    """Queue a view of an article, added to its view counter on the next flush."""
+    with _lock:
+        _view_counts[article_id] += 1
+        pending = len(_view_counts)
+
+    _ensure_flusher()
+    if pending >= config.VIEW_FLUSH_MAX_PENDING:
+        _wakeup.set()
+
+
+def flush():
+    """Write all pending view counts to the database."""
+    global _view_counts
+    with _lock:
+        view_counts, _view_counts = _view_counts, Counter()
+
+    try:
+        Articles.add_views(dict(view_counts))
+    except Exception as e:
+        print(f'Error flushing view counts, will retry: {e}')
+        with _lock:
+            _view_counts.update(view_counts)
+
+
+def _run_flusher():
+    while True:
+        _wakeup.wait(config.VIEW_FLUSH_INTERVAL_SECONDS)
+        _wakeup.clear()
+        if _view_counts:
+            flush()
+
+
+def _ensure_flusher():
+    """Start the flusher thread, once per process (again after a fork)."""
+    global _flusher, _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _lock:
+        if _flusher_pid != os.getpid():
+            _flusher = threading.Thread(target=_run_flusher, name='view-events-flusher', daemon=True)
+            _flusher.start()
+            _flusher_pid = os.getpid()
+
+
+def _flush_at_exit():
+    if _view_counts:
+        flush()
+
+
+atexit.register(_flush_at_exit)